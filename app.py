@@ -1,30 +1,109 @@
+import asyncio
+import bisect
+import collections
+import contextvars
+import fcntl
+import functools
+import gc
+import gzip
+import hashlib
+import hmac
+import io
+import json
 import logging
+import logging.handlers
+import mmap
 import os
+import queue
 import random
+import re
 import sqlite3
+import struct
 import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
 from enum import Enum
 from pathlib import Path
+from typing import Any
 from typing import TypeAlias
+from urllib.parse import quote
+from urllib.parse import urlsplit
 
+import anyio.to_thread
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi import HTTPException
+from fastapi import Query
 from fastapi import Request
 from fastapi import status
 from fastapi.responses import FileResponse
 from fastapi.responses import HTMLResponse
+from fastapi.responses import PlainTextResponse
+from fastapi.responses import RedirectResponse
 from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import escape
 from minio import Minio
+from minio.error import S3Error
 from pydantic import BaseModel
+from pydantic import Field
+
+try:
+    import brotli
+except ImportError:  # optional: static pages are served with gzip only
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # optional: the JSON API falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for databases built with csv_to_sqlite.py --compress
+    zstandard = None
+
+try:
+    from PIL import Image
+except ImportError:  # optional: without Pillow pages link the full-size labels in MinIO
+    Image = None
 
 load_dotenv()
 
+
+def env_flag(name: str, default: bool = False) -> bool:
+    return os.environ.get(name, str(default)).lower() in ("true", "1", "yes")
+
+
 # Set constants
+# Local working files (database versions, label manifest cache, label index), shared by all workers
+DATA_DIR = Path(os.environ.get("DATA_DIR", "/tmp"))
+LABEL_INDEX_PATH = DATA_DIR / "bottle_labels.idx"
+# Resized WebP copies of the labels, one directory per width
+LABEL_CACHE_DIR = DATA_DIR / "label_cache"
 MINIO_BUCKET = "wine-bottles"
-IMAGE_DIR = f"https://{os.environ.get('MINIO_ENDPOINT')}/{MINIO_BUCKET}/"
+LABEL_MANIFEST_BUCKET = "wine-data"
+LABEL_MANIFEST_OBJECT = "bottle_manifest.json"
+LABEL_MANIFEST_VERSION = 1
+LABEL_MANIFEST_CACHE_PATH = DATA_DIR / "bottle_manifest.json"
+MINIO_SCHEME = "https" if env_flag("MINIO_SECURE", True) else "http"
+IMAGE_ORIGIN = f"{MINIO_SCHEME}://{os.environ.get('MINIO_ENDPOINT')}"
+IMAGE_DIR = f"{IMAGE_ORIGIN}/{MINIO_BUCKET}/"
 SITE_URL = os.environ.get("SITE_URL", "https://thiswinedoesnotexist.com").rstrip("/")
 DEFAULT_TITLE = "This Wine Does Not Exist - AI Wine Generator"
 DEFAULT_DESCRIPTION = (
@@ -34,7 +113,8 @@ DEFAULT_DESCRIPTION = (
 WineRecord: TypeAlias = dict[str, str | int | float]
 BottleInfo: TypeAlias = tuple[int, str]
 SEOPage: TypeAlias = dict[str, str | list[str]]
-BOTTLE_LIST: list[BottleInfo] = []
+BOTTLE_LIST: Sequence[BottleInfo] = []  # sorted, so a seeded pick is stable across restarts
+LABEL_MANIFEST_ETAG: str | None = None
 SEO_PAGES: dict[str, SEOPage] = {
     "/ai-wine-generator": {
         "title": "AI Wine Generator - This Wine Does Not Exist",
@@ -135,6 +215,48 @@ SEO_PAGES: dict[str, SEOPage] = {
     },
 }
 SITEMAP_PATHS = ["/", *SEO_PAGES.keys()]
+MAX_API_WINES = 10_000
+API_STREAM_CHUNK = 500  # wines per chunk when streaming large /api/wines responses
+# index.html shows labels in a 150px wide box: serve 1x and 2x derivatives
+LABEL_DISPLAY_WIDTH = 150
+LABEL_DERIVATIVE_WIDTHS = (LABEL_DISPLAY_WIDTH, 2 * LABEL_DISPLAY_WIDTH)
+LABEL_DERIVATIVE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+LABEL_CATEGORY_PATTERN = re.compile(r"cat_(\d+)_")
+MAX_PERMALINK_SEED = 2**63 - 1
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE = 50
+MAX_SEARCH_TERMS = 8
+SEARCH_CACHE_SIZE = 1024
+# Served with BACKGROUND_STARTUP + STARTUP_FALLBACK until the database and labels are loaded
+FALLBACK_IMAGE = "/static/wine_logo_2.jpeg"
+FALLBACK_WINES: list[WineRecord] = [
+    {
+        "id": "fallback-1",
+        "name": "Chateau Patience Reserve 2019",
+        "category_1": "Wine",
+        "category_2": "Bordeaux Red Blends",
+        "origin": "Bordeaux, France",
+        "description": "Black currant and cedar up front, with a long, patient finish while the cellar door opens.",
+    },
+    {
+        "id": "fallback-2",
+        "name": "Loading Bay Chardonnay 2021",
+        "category_1": "Wine",
+        "category_2": "Chardonnay",
+        "origin": "Sonoma Coast, California",
+        "description": "Crisp green apple and a touch of oak; pairs well with a page refresh in a few seconds.",
+    },
+    {
+        "id": "fallback-3",
+        "name": "Cold Start Pinot Noir 2020",
+        "category_1": "Wine",
+        "category_2": "Pinot Noir",
+        "origin": "Willamette Valley, Oregon",
+        "description": "Bright cherry and forest floor, poured while the rest of the cellar is being stocked.",
+    },
+]
+# Shared generator for unseeded sampling; permalinks pass their own seeded random.Random
+RNG = random.Random()
 
 
 class WineCategory(Enum):
@@ -168,12 +290,70 @@ class Settings(BaseModel):
     minio_endpoint: str
     minio_access_key: str
     minio_secret_key: str
+    minio_secure: bool = True
     # Analytics - Umami self-hosted on clifford
     umami_website_id: str = ""
     umami_script_src: str = ""
     umami_domains: str = ""
     umami_tag: str = "prod"
     umami_enabled: bool = False
+    # Serve random wines from an in-memory copy of the database instead of SQL
+    wine_catalog_enabled: bool = False
+    # Read-only SQLite connections shared across request threads
+    db_pool_size: int = 8
+    db_pool_timeout: float = 5.0
+    db_mmap_size: int = 256 * 1024 * 1024
+    # Handlers are async; blocking SQLite and MinIO calls run on these bounded executors.
+    # threadpool_size caps Starlette's shared threadpool (sync routes, static files).
+    db_executor_workers: int = 8
+    minio_executor_workers: int = 4
+    threadpool_size: int = 40
+    # /search runs on its own executor with one connection per worker, so searches never wait for (or
+    # hold) the connections and threads wine pages use. Further searches beyond search_queue_size get a
+    # 503, as does a query still running after search_timeout seconds.
+    search_workers: int = 2
+    search_queue_size: int = 16
+    search_timeout: float = 0.5
+    # Matches scored by BM25 per query; words matching more rows are ranked over an even sample of them
+    search_max_candidates: int = 2000
+    # Keep a buffer of rendered random wine pages filled in the background
+    page_pool_enabled: bool = False
+    page_pool_depth: int = 64
+    page_pool_refill_per_second: float = Field(50.0, gt=0)
+    # Redirect / and /wine to a cacheable /wine/{seed} permalink. A seed's wine depends on the database
+    # and label manifest, which are hot-swapped, so permalinks are cached for permalink_max_age only
+    permalink_redirect: bool = False
+    permalink_seed_space: int = 100_000
+    permalink_max_age: int = 300
+    # How often to check MinIO for a new wine_data.db and hot-swap it (0 disables)
+    db_refresh_seconds: int = 300
+    db_download_workers: int = 4
+    db_download_chunk_bytes: int = 8 * 1024 * 1024
+    # How often the background prober re-checks SQLite and MinIO for /health
+    health_probe_interval: float = 15.0
+    # How often to check the bottle label manifest for changes (0 disables)
+    label_manifest_refresh_seconds: int = 300
+    # Accept requests while the database and labels load in the background (not ready until done),
+    # serving FALLBACK_WINES pages meanwhile unless startup_fallback is off (then 503)
+    background_startup: bool = False
+    startup_fallback: bool = True
+    # Link pages to resized WebP labels served from /label (needs Pillow) instead of the originals
+    label_derivatives_enabled: bool = False
+    label_derivative_quality: int = 80
+    # Announce the picked label (preload) and MinIO (preconnect) before the page is rendered
+    early_hints_enabled: bool = True
+    # Bearer token for the /debug profiling and memory endpoints; empty disables them entirely
+    profiling_token: str = ""
+    profile_sample_rate: float = 0.1
+    # Decoded descriptions kept per database when descriptions are stored compressed
+    description_cache_size: int = 4096
+    # Request threads hand log records to a background writer through a bounded queue
+    log_level: str = "INFO"
+    log_queue_enabled: bool = True
+    log_queue_size: int = 10_000
+    # One JSON line per request, and the share of requests whose step-by-step lines are logged
+    access_log_enabled: bool = False
+    log_step_sample_rate: float = 1.0
 
     class Config:
         env_file = ".env"
@@ -183,60 +363,751 @@ settings = Settings(
     minio_endpoint=os.environ["MINIO_ENDPOINT"],
     minio_access_key=os.environ["MINIO_ACCESS_KEY"],
     minio_secret_key=os.environ["MINIO_SECRET_KEY"],
+    minio_secure=MINIO_SCHEME == "https",
     umami_website_id=os.environ.get("UMAMI_WEBSITE_ID", ""),
     umami_script_src=os.environ.get("UMAMI_SCRIPT_SRC", ""),
     umami_domains=os.environ.get("UMAMI_DOMAINS", ""),
     umami_tag=os.environ.get("UMAMI_TAG", "prod"),
-    umami_enabled=os.environ.get("UMAMI_ENABLED", "false").lower() in ("true", "1", "yes"),
+    umami_enabled=env_flag("UMAMI_ENABLED"),
+    wine_catalog_enabled=env_flag("WINE_CATALOG_ENABLED"),
+    db_pool_size=int(os.environ.get("DB_POOL_SIZE", "8")),
+    db_pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT", "5.0")),
+    db_mmap_size=int(os.environ.get("DB_MMAP_SIZE", str(256 * 1024 * 1024))),
+    db_executor_workers=int(os.environ.get("DB_EXECUTOR_WORKERS", "8")),
+    minio_executor_workers=int(os.environ.get("MINIO_EXECUTOR_WORKERS", "4")),
+    threadpool_size=int(os.environ.get("THREADPOOL_SIZE", "40")),
+    search_workers=int(os.environ.get("SEARCH_WORKERS", "2")),
+    search_queue_size=int(os.environ.get("SEARCH_QUEUE_SIZE", "16")),
+    search_timeout=float(os.environ.get("SEARCH_TIMEOUT", "0.5")),
+    search_max_candidates=int(os.environ.get("SEARCH_MAX_CANDIDATES", "2000")),
+    page_pool_enabled=env_flag("PAGE_POOL_ENABLED"),
+    page_pool_depth=int(os.environ.get("PAGE_POOL_DEPTH", "64")),
+    page_pool_refill_per_second=float(os.environ.get("PAGE_POOL_REFILL_PER_SECOND", "50")),
+    permalink_redirect=env_flag("PERMALINK_REDIRECT"),
+    permalink_seed_space=int(os.environ.get("PERMALINK_SEED_SPACE", "100000")),
+    permalink_max_age=int(os.environ.get("PERMALINK_MAX_AGE", "300")),
+    db_refresh_seconds=int(os.environ.get("DB_REFRESH_SECONDS", "300")),
+    db_download_workers=int(os.environ.get("DB_DOWNLOAD_WORKERS", "4")),
+    db_download_chunk_bytes=int(os.environ.get("DB_DOWNLOAD_CHUNK_BYTES", str(8 * 1024 * 1024))),
+    health_probe_interval=float(os.environ.get("HEALTH_PROBE_INTERVAL", "15")),
+    label_manifest_refresh_seconds=int(os.environ.get("LABEL_MANIFEST_REFRESH_SECONDS", "300")),
+    background_startup=env_flag("BACKGROUND_STARTUP"),
+    startup_fallback=env_flag("STARTUP_FALLBACK", True),
+    label_derivatives_enabled=env_flag("LABEL_DERIVATIVES"),
+    label_derivative_quality=int(os.environ.get("LABEL_DERIVATIVE_QUALITY", "80")),
+    early_hints_enabled=env_flag("EARLY_HINTS", True),
+    profiling_token=os.environ.get("PROFILING_TOKEN", ""),
+    profile_sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", "0.1")),
+    description_cache_size=int(os.environ.get("DESCRIPTION_CACHE_SIZE", "4096")),
+    log_level=os.environ.get("LOG_LEVEL", "INFO"),
+    log_queue_enabled=env_flag("LOG_QUEUE", True),
+    log_queue_size=int(os.environ.get("LOG_QUEUE_SIZE", "10000")),
+    access_log_enabled=env_flag("ACCESS_LOG"),
+    log_step_sample_rate=float(os.environ.get("LOG_STEP_SAMPLE_RATE", "1.0")),
 )
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as they are, so message formatting happens on the listener thread.
+
+    Log arguments must not be mutated after the call. When the queue is full (stdout is not
+    keeping up) records are dropped and counted instead of blocking the request.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def is_uvicorn_access(record: logging.LogRecord) -> bool:
+    return record.name == "uvicorn.access"
+
+
+def configure_logging() -> tuple[logging.handlers.QueueListener | None, DeferredQueueHandler | None]:
+    level = getattr(logging, settings.log_level.upper(), logging.INFO)
+    # uvicorn sets up its loggers before importing the app. Its access logger writes to stdout from
+    # the request path and duplicates ACCESS_LOG, so it is disabled or moved onto the queue.
+    uvicorn_access = logging.getLogger("uvicorn.access")
+    if settings.access_log_enabled:
+        uvicorn_access.disabled = True
+    if not settings.log_queue_enabled:
+        logging.basicConfig(stream=sys.stdout, level=level)
+        return None, None
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    stream_handler.addFilter(lambda record: not is_uvicorn_access(record))
+    queue_handler = DeferredQueueHandler(queue.Queue(settings.log_queue_size))
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    # uvicorn's access handlers (and its access line format) move to the listener thread
+    access_handlers = [] if uvicorn_access.disabled else uvicorn_access.handlers[:]
+    for handler in access_handlers:
+        handler.addFilter(is_uvicorn_access)
+    if access_handlers:
+        uvicorn_access.handlers = [queue_handler]
+    listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, *access_handlers)
+    listener.start()
+    return listener, queue_handler
+
+
 # Initialize logger
-logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+LOG_LISTENER, LOG_QUEUE_HANDLER = configure_logging()
 LOG = logging.getLogger(__name__)
+ACCESS_LOG = logging.getLogger(f"{__name__}.access")
+# Whether the current request logs its steps; set per request by MetricsMiddleware
+LOG_STEPS: contextvars.ContextVar[bool] = contextvars.ContextVar("log_steps", default=False)
 
-# Database path
-DB_PATH = Path("/tmp/wine_data.db")
 
+def log_step(msg: str, *args: Any) -> None:
+    """Log one step of a request, for the ``LOG_STEP_SAMPLE_RATE`` share of requests."""
+    if LOG_STEPS.get():
+        LOG.info(msg, *args)
 
-def download_database_from_minio():
-    """Download SQLite database from MinIO at startup."""
-    if DB_PATH.exists():
-        LOG.info(f"Database already exists at {DB_PATH}")
-        return
 
-    LOG.info("Downloading wine database from MinIO...")
+if settings.label_derivatives_enabled and Image is None:
+    LOG.warning("LABEL_DERIVATIVES is set but Pillow is not installed; linking full-size labels")
+LABEL_DERIVATIVES = settings.label_derivatives_enabled and Image is not None
+
+# Database path. Downloaded versions live next to it as wine_data.<etag>.db and DB_PATH is
+# a symlink to the current one.
+DB_PATH = DATA_DIR / "wine_data.db"
+DATABASE_BUCKET = "wine-data"
+DATABASE_OBJECT = "wine_data.db"
+# Codec of databases built with compressed descriptions (must match scripts/csv_to_sqlite.py)
+DESCRIPTION_CODEC = "zstd-dict"
+
+# Set on shutdown to stop background threads
+BACKGROUND_STOP = threading.Event()
+
+# Blocking I/O never runs on the event loop: SQLite reads and MinIO calls get their own executors
+DB_EXECUTOR = ThreadPoolExecutor(max_workers=settings.db_executor_workers, thread_name_prefix="sqlite")
+MINIO_EXECUTOR = ThreadPoolExecutor(max_workers=settings.minio_executor_workers, thread_name_prefix="minio")
+SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=settings.search_workers, thread_name_prefix="search")
+# Searches running or waiting for SEARCH_EXECUTOR
+SEARCH_SLOTS = threading.BoundedSemaphore(settings.search_queue_size)
+
+
+async def run_blocking(executor: ThreadPoolExecutor, func: Callable[..., Any], *args: Any) -> Any:
+    # Carry context variables (LOG_STEPS) into the worker thread, like asyncio.to_thread
+    call = functools.partial(contextvars.copy_context().run, func, *args)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+# Lock names: the database and the labels are fetched under separate locks so they can load concurrently
+DATABASE_LOCK = "wine_data"
+LABELS_LOCK = "bottle_labels"
+
+
+@contextmanager
+def data_dir_lock(name: str) -> Iterator[None]:
+    """Exclusive lock on ``DATA_DIR/<name>.lock``, held around downloads and shared file writes.
+
+    With ``uvicorn --workers N`` the first worker to take it does the work and the others wait,
+    then find the files current. MinIO version checks happen before it is taken. Not reentrant:
+    a process taking it twice blocks on itself.
+    """
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with open(DATA_DIR / f"{name}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def database_version_path(etag: str) -> Path:
+    return DB_PATH.with_name(f"{DB_PATH.stem}.{etag}{DB_PATH.suffix}")
+
+
+def current_database_etag() -> str | None:
+    """ETag of the version DB_PATH points at; None for a plain file from an older release."""
+    name = DB_PATH.resolve().name
+    prefix = f"{DB_PATH.stem}."
+    if name == DB_PATH.name or not (name.startswith(prefix) and name.endswith(DB_PATH.suffix)):
+        return None
+    return name[len(prefix) : -len(DB_PATH.suffix)]
+
+
+def download_object_ranged(client: Minio, bucket: str, object_name: str, size: int, dest: Path) -> None:
+    """Download an object with parallel ranged GETs written straight into place."""
+    chunk_size = settings.db_download_chunk_bytes
+    with open(dest, "wb") as f:
+        f.truncate(size)
+        fd = f.fileno()
+
+        def fetch_chunk(offset: int) -> None:
+            length = min(chunk_size, size - offset)
+            response = client.get_object(bucket, object_name, offset=offset, length=length)
+            try:
+                data = response.read()
+            finally:
+                response.close()
+                response.release_conn()
+            if len(data) != length:
+                raise OSError(f"Short read at offset {offset}: got {len(data)} of {length} bytes")
+            os.pwrite(fd, data, offset)
+
+        with ThreadPoolExecutor(max_workers=settings.db_download_workers, thread_name_prefix="db-download") as pool:
+            list(pool.map(fetch_chunk, range(0, size, chunk_size)))
+        os.fsync(fd)
+
+
+def verify_database_file(path: Path, etag: str, expected_sha256: str | None) -> None:
+    """Check the download against its checksum and SQLite's integrity check; raise ValueError if bad."""
+    # Single-part uploads have the content MD5 as ETag; upload_to_minio.py also stores a SHA-256
+    check_md5 = len(etag) == 32 and all(c in "0123456789abcdef" for c in etag.lower())
+    if check_md5 or expected_sha256:
+        md5, sha256 = hashlib.md5(usedforsecurity=False), hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(1024 * 1024):
+                md5.update(block)
+                sha256.update(block)
+        if check_md5 and md5.hexdigest() != etag.lower():
+            raise ValueError(f"MD5 mismatch for {path}: expected {etag}, got {md5.hexdigest()}")
+        if expected_sha256 and sha256.hexdigest() != expected_sha256.lower():
+            raise ValueError(f"SHA-256 mismatch for {path}: expected {expected_sha256}, got {sha256.hexdigest()}")
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
     try:
-        client = get_minio_client()
-        client.fget_object("wine-data", "wine_data.db", str(DB_PATH))
-        LOG.info(f"✅ Database downloaded successfully to {DB_PATH}")
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+        for suffix in ("-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+    if result != "ok":
+        raise ValueError(f"Integrity check failed for {path}: {result}")
+
+
+def fetch_database_version(client: Minio) -> Path | None:
+    """Download and publish the current wine_data.db version unless DB_PATH already points at it.
+
+    The version is checked before taking DATABASE_LOCK, so workers make their MinIO round trip
+    concurrently; the lock only covers the download and publish, and the check is repeated under
+    it since another worker may have published the same version meanwhile. The file is streamed
+    to a temp path, verified, then renamed into place; returns its path, or None when DB_PATH is
+    already current.
+    """
+    stat = client.stat_object(DATABASE_BUCKET, DATABASE_OBJECT)
+    if DB_PATH.exists() and current_database_etag() == stat.etag:
+        return None
+    version_path = database_version_path(stat.etag)
+    with data_dir_lock(DATABASE_LOCK):
+        if DB_PATH.exists() and current_database_etag() == stat.etag:
+            return None
+        if not version_path.exists():
+            LOG.info(f"Downloading wine database version {stat.etag} ({stat.size / (1024 * 1024):.1f} MB)...")
+            part_path = version_path.with_name(f"{version_path.name}.part")
+            try:
+                download_object_ranged(client, DATABASE_BUCKET, DATABASE_OBJECT, stat.size, part_path)
+                verify_database_file(part_path, stat.etag, (stat.metadata or {}).get("x-amz-meta-sha256"))
+            except BaseException:
+                part_path.unlink(missing_ok=True)
+                raise
+            os.replace(part_path, version_path)
+        publish_database_version(version_path)
+    return version_path
+
+
+def publish_database_version(version_path: Path) -> None:
+    """Atomically point DB_PATH at ``version_path``. Call under DATABASE_LOCK."""
+    link_path = DB_PATH.with_name(f"{DB_PATH.name}.link")
+    link_path.unlink(missing_ok=True)
+    link_path.symlink_to(version_path.name)
+    os.replace(link_path, DB_PATH)
+
+
+def download_database_from_minio():
+    """Download SQLite database from MinIO at startup (once per host, under the data directory lock)."""
+    try:
+        with STAGE_SECONDS.time("db_download"):
+            version_path = fetch_database_version(get_minio_client())
     except Exception as e:
+        MINIO_ERRORS.inc("database_download")
+        if DB_PATH.exists():
+            LOG.warning(f"Could not check for a newer database, using {DB_PATH}: {e}")
+            return
         LOG.error(f"❌ Failed to download database from MinIO: {e}")
         raise
 
+    if version_path is None:
+        LOG.info(f"Database already exists at {DB_PATH}")
+        return
+    LOG.info(f"✅ Database downloaded successfully to {version_path}")
+
+
+LabelValues: TypeAlias = tuple[str, ...]
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def format_labels(labelnames: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[LabelValues, list] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip([*map(str, self.buckets), "+Inf"], counts, strict=True):
+                cumulative += bucket_count
+                bucket_labels = format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        lines += [
+            f"{self.name}{format_labels(self.labelnames, labels)} {value}" for labels, value in sorted(values.items())
+        ]
+        return lines
+
+
+class CallbackMetric:
+    """Gauge or counter whose samples are read from application state at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        kind: str,
+        labelnames: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+    ):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = labelnames
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{self.name}{format_labels(self.labelnames, labels)} {value}" for labels, value in self.collect()]
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "wine_stage_duration_seconds",
+    "Time spent in each stage of serving a wine and of startup.",
+    ("stage",),
+)
+REQUEST_SECONDS = Histogram(
+    "wine_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("route", "method", "status"),
+)
+CATEGORY_FALLBACKS = Counter(
+    "wine_category_fallback_total",
+    "Wines sampled from all categories because the label's category had none.",
+    ("category",),
+)
+MINIO_ERRORS = Counter("wine_minio_errors_total", "Failed MinIO operations.", ("operation",))
+SEARCH_REJECTED = Counter("wine_search_rejected_total", "Searches answered with 503.", ("reason",))
+METRICS: list[Histogram | Counter | CallbackMetric] = [
+    STAGE_SECONDS,
+    REQUEST_SECONDS,
+    CATEGORY_FALLBACKS,
+    MINIO_ERRORS,
+    SEARCH_REJECTED,
+]
+
+
+class AccessRecord:
+    """One access log line; serialized to JSON only when the listener formats it."""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: dict[str, Any]):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return dumps_json(self.fields).decode("utf-8")
+
+
+class MetricsMiddleware:
+    """Times every HTTP request, labelled by the matched route's path template.
+
+    It also decides whether the request's step lines are logged and writes its access record.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sample_rate = settings.log_step_sample_rate
+        LOG_STEPS.set(sample_rate >= 1 or (sample_rate > 0 and RNG.random() < sample_rate))
+        status_code = 500
+        body_bytes = 0
+
+        async def send_with_status(message):
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            if route is not None:
+                path = route.path
+            elif scope["path"].startswith("/static/"):
+                path = "/static"
+            else:
+                path = "unmatched"
+            REQUEST_SECONDS.observe(elapsed, path, scope["method"], str(status_code))
+            if settings.access_log_enabled:
+                client = scope.get("client")
+                ACCESS_LOG.info(
+                    AccessRecord(
+                        {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "route": path,
+                            "status": status_code,
+                            "ms": round(elapsed * 1000, 2),
+                            "bytes": body_bytes,
+                            "client": client[0] if client else None,
+                        }
+                    )
+                )
+
+
+# Leaf frames of threads that are waiting rather than working (lock/queue waits, idle event loop, idle executor)
+IDLE_FRAMES = {("threading.py", "wait"), ("selectors.py", "select"), ("thread.py", "_worker")}
+PROFILED_PATHS = frozenset(["/", "/wine", *SEO_PAGES])
+
+
+class StackSampler:
+    """Statistical profiler over ``sys._current_frames()``, run on demand by ``/debug/profile``.
+
+    While a profile is being taken, ``ProfilingMiddleware`` marks a share of the requests to the
+    wine and SEO pages, and every ``interval`` the stacks of all busy threads are recorded as long
+    as a marked request is in flight. Handlers are async and hand blocking work to executor
+    threads, so this covers the event loop and the executors rather than one request. Stacks are
+    aggregated in the folded format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self):
+        self.sample_rate = 0.0  # non-zero only while profiling
+        self.in_flight = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._session = threading.Lock()
+        self._labels: dict[tuple[Any, int], str] = {}
+
+    def enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+
+    def exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _label(self, frame: Any) -> str:
+        key = (frame.f_code, frame.f_lineno)
+        label = self._labels.get(key)
+        if label is None:
+            code = frame.f_code
+            label = self._labels[key] = f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        return label
+
+    def profile(self, seconds: float, interval: float, sample_rate: float, idle: bool = False) -> tuple[str, int, int]:
+        """Sample for ``seconds``; returns (folded stacks, stack samples, requests sampled)."""
+        if not self._session.acquire(blocking=False):
+            raise HTTPException(status_code=409, detail="A profile is already being taken")
+        stacks: collections.Counter[str] = collections.Counter()
+        samples = 0
+        me = threading.get_ident()
+        try:
+            self.requests = 0
+            self.sample_rate = sample_rate
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline and not BACKGROUND_STOP.wait(interval):
+                if self.in_flight <= 0:
+                    continue
+                samples += 1
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    code = frame.f_code
+                    if ident == me or (not idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES):
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(self._label(frame))
+                        frame = frame.f_back
+                    labels.append(names.get(ident, str(ident)))
+                    stacks[";".join(reversed(labels))] += 1
+        finally:
+            self.sample_rate = 0.0
+            self._labels.clear()
+            self._session.release()
+        folded = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        return folded, samples, self.requests
+
+
+PROFILER = StackSampler()
+
+
+class ProfilingMiddleware:
+    """Marks ``PROFILER.sample_rate`` of wine and SEO page requests while a profile is being taken.
+
+    Only installed when ``PROFILING_TOKEN`` is set; otherwise requests never pass through it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        sample_rate = PROFILER.sample_rate
+        if (
+            not sample_rate
+            or scope["type"] != "http"
+            or scope["path"] not in PROFILED_PATHS
+            or RNG.random() >= sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+        PROFILER.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            PROFILER.exit()
+
+
+EARLY_HINTS_SCOPE_KEY = "wine.early_hints"
+
+
+def is_wine_page_path(path: str) -> bool:
+    return path in ("/", "/wine") or path.startswith("/wine/")
+
+
+class EarlyHintsMiddleware:
+    """Lets wine page handlers announce ``Link`` headers before their response is ready.
+
+    Handlers call the function stored under ``EARLY_HINTS_SCOPE_KEY`` in the scope. When the
+    server supports the ASGI ``http.response.early_hint`` extension, the links go out at once as
+    a 103 Early Hints response; they are also added to the final response's headers, which is
+    all that servers without the extension (such as uvicorn) get.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not is_wine_page_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        supports_103 = "http.response.early_hint" in scope.get("extensions", {})
+        links: list[bytes] = []
+
+        async def early_hints(new_links: list[bytes]) -> None:
+            links.extend(new_links)
+            if supports_103:
+                await send({"type": "http.response.early_hint", "links": new_links})
+
+        async def send_with_links(message):
+            if links and message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"link", b", ".join(links))]
+            await send(message)
+
+        scope[EARLY_HINTS_SCOPE_KEY] = early_hints
+        await self.app(scope, receive, send_with_links)
+
 
 # Initialize FastAPI app
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+if settings.profiling_token:
+    app.add_middleware(ProfilingMiddleware)
+if settings.early_hints_enabled:
+    app.add_middleware(EarlyHintsMiddleware)
+
+
+STARTUP_COMPLETE = threading.Event()
+
+
+def timed_phase(phases: dict[str, float], name: str, func: Callable[[], None]) -> None:
+    start = time.perf_counter()
+    try:
+        func()
+    finally:
+        phases[name] = time.perf_counter() - start
+
+
+def load_startup_data() -> None:
+    """Fetch the database and the bottle labels concurrently, then build what depends on them."""
+    phases: dict[str, float] = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup") as pool:
+        futures = [
+            pool.submit(timed_phase, phases, "database", download_database_from_minio),
+            pool.submit(timed_phase, phases, "labels", load_bottle_list),
+        ]
+        for future in futures:
+            future.result()
+    # A health probe may have opened the pool before the database was published
+    current_path = DB_PATH.resolve()
+    if DB_POOL is not None and DB_POOL.db_path != current_path:
+        swap_database(current_path)
+    if settings.wine_catalog_enabled:
+        timed_phase(phases, "catalog", load_wine_catalog)
+    if settings.page_pool_enabled and WINE_PAGE_POOL is None:
+        start_wine_page_pool()
+    STARTUP_COMPLETE.set()
+    breakdown = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in phases.items())
+    LOG.info(f"Startup data loaded in {(time.perf_counter() - start) * 1000:.0f} ms ({breakdown})")
+
+
+def load_startup_data_in_background() -> None:
+    """Retry ``load_startup_data`` with backoff while the server is already accepting requests."""
+    delay = 1.0
+    while not BACKGROUND_STOP.is_set():
+        try:
+            load_startup_data()
+            HEALTH_PROBER.probe("database")
+            return
+        except Exception as e:
+            LOG.error(f"Loading startup data failed, retrying in {delay:.0f}s: {e}")
+        if BACKGROUND_STOP.wait(delay):
+            return
+        delay = min(delay * 2, 60.0)
 
 
 # Download database on startup
 @app.on_event("startup")
 def startup_event():
-    download_database_from_minio()
-    load_bottle_list()
+    start = time.perf_counter()
+    precompile_templates()
+    prerender_static_responses()
+    LOG.info(f"Templates and static responses ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+    if settings.background_startup:
+        threading.Thread(target=load_startup_data_in_background, name="startup", daemon=True).start()
+    else:
+        load_startup_data()
+    if settings.label_manifest_refresh_seconds > 0:
+        threading.Thread(target=refresh_bottle_list_forever, name="label-manifest", daemon=True).start()
+    if settings.db_refresh_seconds > 0:
+        threading.Thread(target=refresh_database_forever, name="db-refresh", daemon=True).start()
+    HEALTH_PROBER.start()
+
+
+@app.on_event("startup")
+async def configure_threadpool():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    BACKGROUND_STOP.set()
+    if WINE_PAGE_POOL is not None:
+        WINE_PAGE_POOL.stop()
+    DB_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    MINIO_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    SEARCH_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    if DB_POOL is not None:
+        DB_POOL.close()
+    if SEARCH_POOL is not None:
+        SEARCH_POOL.close()
+    if LOG_LISTENER is not None:
+        # Flushes queued records; later records wait in the queue (or are dropped when it is full)
+        LOG_LISTENER.stop()
 
 
 # Set up static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Set up Jinja2 templates
+# Set up Jinja2 templates. Compiled templates are cached on disk so new workers skip compilation.
+JINJA_CACHE_DIR = DATA_DIR / "jinja_cache"
+JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 templates = Jinja2Templates(directory="templates")
+templates.env.bytecode_cache = FileSystemBytecodeCache(str(JINJA_CACHE_DIR))
+
 
+def precompile_templates() -> None:
+    """Compile every template (from the bytecode cache when possible) and the wine page skeleton."""
+    start = time.perf_counter()
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    wine_page_skeleton(site_request("/"))
+    LOG.info(f"Precompiled {len(names)} templates in {(time.perf_counter() - start) * 1000:.1f} ms")
 
+
+@functools.cache
 def get_minio_client():
     return Minio(
         settings.minio_endpoint,
         access_key=settings.minio_access_key,
         secret_key=settings.minio_secret_key,
-        secure=True,
+        secure=settings.minio_secure,
     )
 
 
@@ -268,36 +1139,658 @@ def get_seo_context(
     }
 
 
-def get_db_connection():
+def get_db_connection(db_path: Path | None = None) -> sqlite3.Connection:
     """Get SQLite database connection."""
     try:
-        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+        conn = sqlite3.connect(
+            f"file:{db_path or DB_PATH}?mode=ro", uri=True, check_same_thread=False, cached_statements=256
+        )
         conn.row_factory = sqlite3.Row  # Return rows as dict-like objects
         conn.execute("PRAGMA query_only = ON")
         conn.execute("PRAGMA cache_size = 10000")
+        conn.execute(f"PRAGMA mmap_size = {settings.db_mmap_size}")
         return conn
     except sqlite3.Error as e:
         LOG.error(f"Unable to connect to the database: {e}")
         raise
 
 
-def get_bottle_list() -> list[BottleInfo]:
+class SQLitePool:
+    """Bounded pool of read-only SQLite connections shared by request threads.
+
+    Connections are opened and configured once, then checked out per request so their page
+    cache, statement cache and mmap stay warm between requests.
+    """
+
+    def __init__(self, db_path: Path, max_size: int, timeout: float):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._closed = False
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        start = time.perf_counter()
+        conn = self._acquire()
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._size < self.max_size
+            if can_open:
+                self._size += 1
+        if can_open:
+            try:
+                return get_db_connection(self.db_path)
+            except sqlite3.Error:
+                with self._lock:
+                    self._size -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self.timeouts += 1
+            LOG.error("Timed out after %ss waiting for a database connection", self.timeout)
+            raise HTTPException(status_code=503, detail="Database busy") from None
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        # Checked and returned under the lock close() drains under, so no connection can be put
+        # back into a pool that has already been drained
+        with self._lock:
+            closed = self._closed
+            if closed:
+                self._size -= 1
+            else:
+                self._idle.put(conn)
+        if closed:
+            conn.close()
+
+    def close(self) -> None:
+        """Close idle connections; connections still checked out are closed when returned."""
+        idle = []
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    idle.append(self._idle.get_nowait())
+                except queue.Empty:
+                    break
+            self._size -= len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "size": self._size,
+                "max_size": self.max_size,
+                "idle": self._idle.qsize(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds,
+                "wait_seconds_max": self.max_wait_seconds,
+            }
+
+
+DB_POOL: SQLitePool | None = None
+DB_POOL_LOCK = threading.Lock()
+# Cumulative stats of pools replaced by swap_database, so the pool counters carry on across hot swaps
+DB_POOL_COUNTERS = ("checkouts", "timeouts", "wait_seconds_total")
+RETIRED_DB_POOL_STATS: collections.Counter[str] = collections.Counter()
+
+
+def get_db_pool() -> SQLitePool:
+    global DB_POOL
+    if DB_POOL is None:
+        with DB_POOL_LOCK:
+            if DB_POOL is None:
+                DB_POOL = SQLitePool(DB_PATH.resolve(), settings.db_pool_size, settings.db_pool_timeout)
+    return DB_POOL
+
+
+SEARCH_POOL: SQLitePool | None = None
+
+
+def get_search_pool() -> SQLitePool:
+    """Connections to the current database for SEARCH_EXECUTOR's threads only."""
+    global SEARCH_POOL
+    if SEARCH_POOL is None:
+        db_path = get_db_pool().db_path
+        with DB_POOL_LOCK:
+            if SEARCH_POOL is None:
+                # DB_POOL may have been swapped since; it is replaced together with SEARCH_POOL
+                db_path = DB_POOL.db_path if DB_POOL is not None else db_path
+                SEARCH_POOL = SQLitePool(db_path, settings.search_workers, settings.db_pool_timeout)
+    return SEARCH_POOL
+
+
+class WineCatalog:
+    """Read-only, in-memory copy of ``wine_descriptions`` grouped by category.
+
+    Rows are kept as plain tuples in one array per ``WineCategory`` so a random pick is a
+    single index into a tuple with no SQL involved. Compressed descriptions stay compressed
+    in memory and are decoded when sampled.
+    """
+
+    def __init__(self, columns: tuple[str, ...], rows: list[tuple], codec: "DescriptionCodec | None" = None):
+        self.columns = columns
+        self.codec = codec
+        self.all_rows = tuple(rows)
+        category_index = columns.index("category_2")
+        by_name: dict[str, list[tuple]] = {category.display_name: [] for category in WineCategory}
+        for row in self.all_rows:
+            if row[category_index] in by_name:
+                by_name[row[category_index]].append(row)
+        self.rows_by_category = {category: tuple(by_name[category.display_name]) for category in WineCategory}
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection, codec: "DescriptionCodec | None" = None) -> "WineCatalog":
+        cur = conn.execute("SELECT * FROM wine_descriptions ORDER BY rowid")
+        columns = tuple(column[0] for column in cur.description)
+        return cls(columns, [tuple(row) for row in cur], codec)
+
+    def __len__(self) -> int:
+        return len(self.all_rows)
+
+    def sample(self, category: WineCategory | None = None, rng: random.Random = RNG) -> WineRecord | None:
+        """Return a random wine from ``category`` (or any category), or None if there is none."""
+        rows = self.all_rows if category is None else self.rows_by_category[category]
+        if not rows:
+            return None
+        return decode_wine(dict(zip(self.columns, rows[rng.randrange(len(rows))], strict=True)), self.codec)
+
+
+WINE_CATALOG: WineCatalog | None = None
+CategoryRange: TypeAlias = tuple[int, int]
+CATEGORY_RANGES: dict[Path, dict[str, CategoryRange]] = {}
+
+
+def get_category_ranges(conn: sqlite3.Connection, db_path: Path) -> dict[str, CategoryRange]:
+    """Return ``category_2 -> (first_rowid, count)`` written by ``scripts/csv_to_sqlite.py``.
+
+    Older databases without a ``category_ranges`` table return an empty dict, in which case
+    callers fall back to a COUNT/OFFSET scan of the category.
+    """
+    if db_path not in CATEGORY_RANGES:
+        try:
+            rows = conn.execute("SELECT category_2, first_rowid, count FROM category_ranges").fetchall()
+        except sqlite3.OperationalError:
+            LOG.warning(f"No category_ranges table in {db_path}; sampling by OFFSET scan")
+            rows = []
+        CATEGORY_RANGES[db_path] = {row["category_2"]: (row["first_rowid"], row["count"]) for row in rows}
+    return CATEGORY_RANGES[db_path]
+
+
+class DescriptionCodec:
+    """Decodes descriptions stored by ``scripts/csv_to_sqlite.py --compress``: zstd frames
+    compressed against a dictionary kept in the database's ``description_codec`` table.
+
+    Decompressors are not thread-safe, so each thread gets its own. Recently decoded
+    descriptions are kept in a small LRU, keyed by the compressed bytes.
+    """
+
+    def __init__(self, dictionary: bytes):
+        self.dictionary = zstandard.ZstdCompressionDict(dictionary)
+        self._local = threading.local()
+        self.decode = functools.lru_cache(maxsize=settings.description_cache_size)(self._decode)
+
+    def _decode(self, data: bytes) -> str:
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor(dict_data=self.dictionary)
+        return decompressor.decompress(data).decode("utf-8")
+
+
+DESCRIPTION_CODECS: dict[Path, DescriptionCodec | None] = {}
+
+
+def get_description_codec(conn: sqlite3.Connection, db_path: Path) -> DescriptionCodec | None:
+    """Codec for the database's compressed descriptions, or None when they are plain text."""
+    if db_path not in DESCRIPTION_CODECS:
+        try:
+            row = conn.execute("SELECT codec, dictionary FROM description_codec").fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        codec = None
+        if row is not None:
+            if row["codec"] != DESCRIPTION_CODEC:
+                raise RuntimeError(f"Unsupported description codec {row['codec']!r} in {db_path}")
+            if zstandard is None:
+                raise RuntimeError(f"{db_path} stores compressed descriptions; install the zstandard package")
+            codec = DescriptionCodec(row["dictionary"])
+            LOG.info(f"Descriptions in {db_path} are compressed ({len(row['dictionary']) / 1024:.0f} KiB dictionary)")
+        DESCRIPTION_CODECS[db_path] = codec
+    return DESCRIPTION_CODECS[db_path]
+
+
+def decode_wine(wine: WineRecord, codec: DescriptionCodec | None) -> WineRecord:
+    if codec is not None:
+        wine["description"] = codec.decode(wine["description"])
+    return wine
+
+
+def fetch_random_row_in_range(
+    conn: sqlite3.Connection, category_range: CategoryRange, rng: random.Random = RNG
+) -> sqlite3.Row | None:
+    first_rowid, count = category_range
+    if count <= 0:
+        return None
+    rowid = first_rowid + rng.randrange(count)
+    return conn.execute("SELECT * FROM wine_descriptions WHERE rowid = ?", (rowid,)).fetchone()
+
+
+def fetch_random_row_by_offset(
+    conn: sqlite3.Connection, category_2: str | None, rng: random.Random = RNG
+) -> sqlite3.Row | None:
+    """Pick a random row without ``category_ranges`` (databases built before it existed)."""
+    where, params = ("WHERE category_2 = ?", (category_2,)) if category_2 is not None else ("", ())
+    count = conn.execute(f"SELECT COUNT(*) FROM wine_descriptions {where}", params).fetchone()[0]
+    if count == 0:
+        return None
+    return conn.execute(
+        f"SELECT * FROM wine_descriptions {where} ORDER BY rowid LIMIT 1 OFFSET ?", (*params, rng.randrange(count))
+    ).fetchone()
+
+
+def load_wine_catalog() -> None:
+    global WINE_CATALOG
+    pool = get_db_pool()
+    with pool.connection() as conn:
+        WINE_CATALOG = WineCatalog.from_connection(conn, get_description_codec(conn, pool.db_path))
+    LOG.info(f"Loaded {len(WINE_CATALOG)} wines into the in-memory catalog")
+
+
+def list_bottles_in_bucket() -> list[BottleInfo]:
     objects = get_minio_client().list_objects(MINIO_BUCKET, recursive=True)
     return [
         (int(obj.object_name.split("cat_")[1].split("_")[0]), obj.object_name) for obj in objects if obj.object_name
     ]
 
 
+def parse_label_manifest(data: bytes) -> list[BottleInfo]:
+    manifest = json.loads(data)
+    if manifest.get("version") != LABEL_MANIFEST_VERSION:
+        raise ValueError(f"Unsupported label manifest version: {manifest.get('version')}")
+    return [(int(category), str(path)) for category, path in manifest["labels"]]
+
+
+def build_label_manifest(bottles: list[BottleInfo]) -> bytes:
+    """Serialize bottles in the format written by ``scripts/build_label_manifest.py``."""
+    manifest = {
+        "version": LABEL_MANIFEST_VERSION,
+        "generated_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "bucket": MINIO_BUCKET,
+        "labels": sorted(bottles),
+    }
+    return json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+
+
+def read_label_manifest_cache() -> tuple[str, list[BottleInfo]] | None:
+    """Return (etag, bottles) from the local disk cache, if present and valid."""
+    etag_path = LABEL_MANIFEST_CACHE_PATH.with_suffix(".etag")
+    try:
+        return etag_path.read_text().strip(), parse_label_manifest(LABEL_MANIFEST_CACHE_PATH.read_bytes())
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        if LABEL_MANIFEST_CACHE_PATH.exists():
+            LOG.warning(f"Ignoring unreadable label manifest cache: {e}")
+        return None
+
+
+def write_label_manifest_cache(etag: str, data: bytes) -> None:
+    tmp_path = LABEL_MANIFEST_CACHE_PATH.with_suffix(".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, LABEL_MANIFEST_CACHE_PATH)
+    LABEL_MANIFEST_CACHE_PATH.with_suffix(".etag").write_text(etag)
+
+
+def fetch_label_manifest(client: Minio, known_etag: str | None) -> tuple[str, list[BottleInfo]] | None:
+    """Download the manifest if its ETag differs from ``known_etag``; None when unchanged.
+
+    Only the download and the cache write happen under LABELS_LOCK. The cache is checked again
+    under it, so workers that find the same new ETag download it once.
+    """
+    etag = client.stat_object(LABEL_MANIFEST_BUCKET, LABEL_MANIFEST_OBJECT).etag
+    if etag == known_etag:
+        return None
+    with data_dir_lock(LABELS_LOCK):
+        cached = read_label_manifest_cache()
+        if cached is not None and cached[0] == etag:
+            return cached
+        response = client.get_object(LABEL_MANIFEST_BUCKET, LABEL_MANIFEST_OBJECT)
+        try:
+            data = response.read()
+            etag = response.headers.get("ETag", "").strip('"')
+        finally:
+            response.close()
+            response.release_conn()
+        bottles = parse_label_manifest(data)
+        write_label_manifest_cache(etag, data)
+    return etag, bottles
+
+
+def publish_label_manifest(client: Minio, bottles: list[BottleInfo]) -> str | None:
+    """Store a manifest generated from a bucket listing so later starts skip the listing."""
+    data = build_label_manifest(bottles)
+    try:
+        result = client.put_object(
+            LABEL_MANIFEST_BUCKET, LABEL_MANIFEST_OBJECT, io.BytesIO(data), len(data), content_type="application/json"
+        )
+    except S3Error as e:
+        MINIO_ERRORS.inc("label_manifest_publish")
+        LOG.warning(f"Could not publish label manifest: {e}")
+        return None
+    write_label_manifest_cache(result.etag, data)
+    return result.etag
+
+
+def swap_database(version_path: Path) -> None:
+    """Switch readers to ``version_path``.
+
+    Requests already holding a connection finish on the old file; its connections are closed
+    as they are returned.
+    """
+    global DB_POOL, SEARCH_POOL, WINE_CATALOG
+    new_pool = SQLitePool(version_path.resolve(), settings.db_pool_size, settings.db_pool_timeout)
+    catalog = None
+    with new_pool.connection() as conn:
+        get_category_ranges(conn, new_pool.db_path)
+        codec = get_description_codec(conn, new_pool.db_path)
+        if WINE_CATALOG is not None:
+            catalog = WineCatalog.from_connection(conn, codec)
+
+    with DB_POOL_LOCK:
+        old_pool, DB_POOL = DB_POOL, new_pool
+        old_search_pool, SEARCH_POOL = SEARCH_POOL, None
+        if old_pool is not None:
+            old_stats = old_pool.stats()
+            RETIRED_DB_POOL_STATS.update({stat: old_stats[stat] for stat in DB_POOL_COUNTERS})
+    if catalog is not None:
+        WINE_CATALOG = catalog
+    if old_search_pool is not None:
+        old_search_pool.close()
+    if old_pool is not None:
+        old_pool.close()
+        CATEGORY_RANGES.pop(old_pool.db_path, None)
+        DESCRIPTION_CODECS.pop(old_pool.db_path, None)
+        SEARCH_INDEX.pop(old_pool.db_path, None)
+        search_wines_cached.cache_clear()
+    LOG.info(f"Switched to database {new_pool.db_path}")
+
+    # Keep the previous version around for requests (and other workers) that may still be reading it
+    with data_dir_lock(DATABASE_LOCK):
+        keep = {DB_PATH.resolve(), new_pool.db_path, old_pool.db_path if old_pool else None}
+        for path in DB_PATH.parent.glob(f"{DB_PATH.stem}.*{DB_PATH.suffix}"):
+            if path.resolve() not in keep and not path.is_symlink():
+                for stale in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+                    stale.unlink(missing_ok=True)
+
+
+def refresh_database_forever() -> None:
+    """Poll MinIO for a new wine_data.db version and hot-swap it in."""
+    while not BACKGROUND_STOP.wait(settings.db_refresh_seconds):
+        try:
+            fetch_database_version(get_minio_client())
+            # Also picks up a version another worker published
+            current_path = DB_PATH.resolve()
+            if DB_POOL is None or DB_POOL.db_path != current_path:
+                swap_database(current_path)
+        except Exception as e:
+            MINIO_ERRORS.inc("database_refresh")
+            LOG.warning(f"Database refresh failed: {e}")
+
+
+def get_bottle_list() -> list[BottleInfo]:
+    """Load bottle labels from the manifest, falling back to listing the bucket."""
+    global LABEL_MANIFEST_ETAG
+    cached = read_label_manifest_cache()
+    client = get_minio_client()
+    try:
+        fetched = fetch_label_manifest(client, cached[0] if cached else None)
+    except S3Error as e:
+        if e.code != "NoSuchKey":
+            raise
+        with data_dir_lock(LABELS_LOCK):
+            published = read_label_manifest_cache()
+            if published is not None and published[0] != (cached[0] if cached else None):
+                # Another worker listed the bucket and published a manifest while this one waited
+                LABEL_MANIFEST_ETAG = published[0]
+                return published[1]
+            LOG.warning(f"No label manifest at {LABEL_MANIFEST_BUCKET}/{LABEL_MANIFEST_OBJECT}; listing {MINIO_BUCKET}")
+            bottles = list_bottles_in_bucket()
+            LABEL_MANIFEST_ETAG = publish_label_manifest(client, bottles)
+        return bottles
+    except Exception as e:
+        MINIO_ERRORS.inc("label_manifest")
+        if cached is None:
+            raise
+        LOG.warning(f"MinIO unavailable, using cached label manifest: {e}")
+        LABEL_MANIFEST_ETAG = cached[0]
+        return cached[1]
+
+    if fetched is None:
+        assert cached is not None
+        fetched = cached
+        LOG.info("Label manifest unchanged, using local cache")
+    LABEL_MANIFEST_ETAG = fetched[0]
+    return fetched[1]
+
+
+LABEL_INDEX_HEADER = struct.Struct("<8s32sI")  # magic, SHA-256 of the labels, label count
+LABEL_INDEX_ENTRY = struct.Struct("<III")  # category, path offset, path length
+LABEL_INDEX_MAGIC = b"WLBLIDX1"
+
+
+class LabelIndex(Sequence[BottleInfo]):
+    """Sorted bottle labels read from a memory-mapped file, so workers share one copy.
+
+    The file holds a header, one fixed-size entry per label and then the UTF-8 paths.
+    Contiguous slices are views over the same mapping.
+    """
+
+    def __init__(self, buffer: mmap.mmap, start: int = 0, stop: int | None = None):
+        magic, self.digest, count = LABEL_INDEX_HEADER.unpack_from(buffer)
+        if magic != LABEL_INDEX_MAGIC:
+            raise ValueError("Not a bottle label index")
+        self.buffer = buffer
+        self.start = start
+        self.stop = count if stop is None else stop
+
+    @classmethod
+    def open(cls, path: Path) -> "LabelIndex":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def digest_of(bottles: list[BottleInfo]) -> bytes:
+        return hashlib.sha256(json.dumps(bottles, separators=(",", ":")).encode("utf-8")).digest()
+
+    @classmethod
+    def write(cls, path: Path, bottles: list[BottleInfo]) -> None:
+        """Write ``bottles`` (sorted) to ``path`` atomically."""
+        paths = [label_path.encode("utf-8") for _, label_path in bottles]
+        data = bytearray(LABEL_INDEX_HEADER.pack(LABEL_INDEX_MAGIC, cls.digest_of(bottles), len(bottles)))
+        offset = LABEL_INDEX_HEADER.size + LABEL_INDEX_ENTRY.size * len(bottles)
+        for (category, _), encoded in zip(bottles, paths, strict=True):
+            data += LABEL_INDEX_ENTRY.pack(category, offset, len(encoded))
+            offset += len(encoded)
+        for encoded in paths:
+            data += encoded
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return LabelIndex(self.buffer, self.start + start, self.start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("label index out of range")
+        category, offset, length = LABEL_INDEX_ENTRY.unpack_from(
+            self.buffer, LABEL_INDEX_HEADER.size + (self.start + index) * LABEL_INDEX_ENTRY.size
+        )
+        return category, self.buffer[offset : offset + length].decode("utf-8")
+
+    def by_category(self) -> dict[int, "LabelIndex"]:
+        """Views of each category's labels, which are contiguous because the index is sorted."""
+        entries = self.buffer[
+            LABEL_INDEX_HEADER.size + self.start * LABEL_INDEX_ENTRY.size : LABEL_INDEX_HEADER.size
+            + self.stop * LABEL_INDEX_ENTRY.size
+        ]
+        groups: dict[int, LabelIndex] = {}
+        first, current = 0, None
+        for i, (category, _, _) in enumerate(LABEL_INDEX_ENTRY.iter_unpack(entries)):
+            if category != current:
+                if current is not None:
+                    groups[current] = self[first:i]
+                first, current = i, category
+        if current is not None:
+            groups[current] = self[first:]
+        return groups
+
+
+def open_label_index(bottles: list[BottleInfo]) -> LabelIndex:
+    """Map the shared label index, rewriting it first if it holds other labels. Call under LABELS_LOCK."""
+    bottles = sorted(bottles)
+    digest = LabelIndex.digest_of(bottles)
+    try:
+        index = LabelIndex.open(LABEL_INDEX_PATH)
+        if index.digest == digest:
+            return index
+    except (OSError, ValueError, struct.error):
+        pass
+    LabelIndex.write(LABEL_INDEX_PATH, bottles)
+    return LabelIndex.open(LABEL_INDEX_PATH)
+
+
 def load_bottle_list() -> None:
+    """Load the labels once per host: the first worker fetches them, the rest reuse its cache and index."""
     global BOTTLE_LIST
-    BOTTLE_LIST = get_bottle_list()
+    with STAGE_SECONDS.time("bottle_list"):
+        bottles = get_bottle_list()
+        with data_dir_lock(LABELS_LOCK):
+            BOTTLE_LIST = open_label_index(bottles)
     LOG.info(f"Loaded {len(BOTTLE_LIST)} wine bottle labels")
 
 
-def sample_label_from_minio() -> BottleInfo:
+def refresh_bottle_list_forever() -> None:
+    """Swap in a new bottle list whenever the manifest's ETag changes."""
+    global BOTTLE_LIST, LABEL_MANIFEST_ETAG
+    while not BACKGROUND_STOP.wait(settings.label_manifest_refresh_seconds):
+        try:
+            fetched = fetch_label_manifest(get_minio_client(), LABEL_MANIFEST_ETAG)
+            if fetched is None:
+                continue
+            with data_dir_lock(LABELS_LOCK):
+                labels = open_label_index(fetched[1])
+        except Exception as e:
+            MINIO_ERRORS.inc("label_manifest_refresh")
+            LOG.warning(f"Label manifest refresh failed: {e}")
+            continue
+        LABEL_MANIFEST_ETAG, BOTTLE_LIST = fetched[0], labels
+        LOG.info(f"Reloaded {len(BOTTLE_LIST)} wine bottle labels from manifest {LABEL_MANIFEST_ETAG}")
+
+
+LABELS_BY_CATEGORY: tuple[Sequence[BottleInfo], dict[int, Sequence[BottleInfo]]] = ([], {})
+
+
+def get_labels_by_category() -> dict[int, Sequence[BottleInfo]]:
+    """Group BOTTLE_LIST by category, rebuilding when the list is replaced."""
+    global LABELS_BY_CATEGORY
+    bottles, grouped = LABELS_BY_CATEGORY
+    if bottles is not BOTTLE_LIST:
+        bottles = BOTTLE_LIST
+        if isinstance(bottles, LabelIndex):
+            grouped = dict(bottles.by_category())
+        else:
+            lists: dict[int, list[BottleInfo]] = {}
+            for bottle in bottles:
+                lists.setdefault(bottle[0], []).append(bottle)
+            grouped = dict(lists)
+        LABELS_BY_CATEGORY = (bottles, grouped)
+    return grouped
+
+
+def sample_label_from_minio(rng: random.Random = RNG) -> BottleInfo:
     if not BOTTLE_LIST:
         load_bottle_list()
-    return random.choice(BOTTLE_LIST)
+    return BOTTLE_LIST[rng.randrange(len(BOTTLE_LIST))]
+
+
+def is_known_label(label_path: str) -> bool:
+    """Whether ``label_path`` is in the label list (a binary search; the list is sorted)."""
+    match = LABEL_CATEGORY_PATTERN.match(label_path)
+    if match is None:
+        return False
+    label = (int(match.group(1)), label_path)
+    i = bisect.bisect_left(BOTTLE_LIST, label)
+    return i < len(BOTTLE_LIST) and BOTTLE_LIST[i] == label
+
+
+def label_derivative_url(width: int, label_path: str) -> str:
+    return f"/label/{width}/{quote(label_path)}"
+
+
+def label_derivative_path(width: int, label_path: str) -> Path:
+    return LABEL_CACHE_DIR / str(width) / f"{label_path}.webp"
+
+
+def build_label_derivative(width: int, label_path: str) -> Path:
+    """Download a label, scale it down to ``width`` and cache it as WebP; returns the cached file.
+
+    Labels are never scaled up. Workers share the cache, and each file is written to a temporary
+    name and renamed into place, so a concurrent reader never sees a partial image.
+    """
+    path = label_derivative_path(width, label_path)
+    if path.exists():
+        return path
+    try:
+        response = get_minio_client().get_object(MINIO_BUCKET, label_path)
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    except Exception:
+        MINIO_ERRORS.inc("label_derivative")
+        raise
+    with Image.open(io.BytesIO(data)) as source:
+        image = source.convert("RGBA" if source.has_transparency_data else "RGB")
+    if image.width > width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.Resampling.LANCZOS)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    image.save(tmp_path, "WEBP", quality=settings.label_derivative_quality, method=4)
+    os.replace(tmp_path, path)
+    return path
 
 
 @app.head("/")
@@ -306,29 +1799,45 @@ def head_main():
     return Response(status_code=status.HTTP_200_OK)
 
 
-def sample_from_sqlite(label_cat_2: int) -> WineRecord:
-    """Sample a wine from SQLite database by category."""
+def sample_from_sqlite(label_cat_2: int, rng: random.Random = RNG) -> WineRecord:
+    """Sample a wine from SQLite database by category.
+
+    A seeded ``rng`` always picks the same wine for the same database.
+    """
     category = WineCategory(label_cat_2)
-    LOG.info(f"Sampling wine for category: {category.display_name}")
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM wine_descriptions WHERE category_2 = ? ORDER BY RANDOM() LIMIT 1",
-            (category.display_name,),
-        )
-        result = cur.fetchone()
+    log_step("Sampling wine for category: %s", category.display_name)
+    if WINE_CATALOG is not None:
+        wine_record = WINE_CATALOG.sample(category, rng)
+        if wine_record is None:
+            LOG.warning("No wine found for category: %s. Sampling from all categories.", category.display_name)
+            CATEGORY_FALLBACKS.inc(category.display_name)
+            wine_record = WINE_CATALOG.sample(None, rng)
+            if wine_record is None:
+                raise HTTPException(status_code=500, detail="No wines found in the database")
+        log_step("Returning wine: %s", wine_record["name"])
+        return wine_record
+
+    pool = get_db_pool()
+    with pool.connection() as conn:
+        ranges = get_category_ranges(conn, pool.db_path)
+        codec = get_description_codec(conn, pool.db_path)
+        if ranges:
+            result = fetch_random_row_in_range(conn, ranges.get(category.display_name, (0, 0)), rng)
+        else:
+            result = fetch_random_row_by_offset(conn, category.display_name, rng)
         if result is None:
-            LOG.warning(f"No wine found for category: {category.display_name}. Sampling from all categories.")
-            cur.execute("SELECT * FROM wine_descriptions ORDER BY RANDOM() LIMIT 1")
-            result = cur.fetchone()
+            LOG.warning("No wine found for category: %s. Sampling from all categories.", category.display_name)
+            CATEGORY_FALLBACKS.inc(category.display_name)
+            if ranges:
+                # Rowids are dense, so 1..total spans every category
+                result = fetch_random_row_in_range(conn, (1, sum(count for _, count in ranges.values())), rng)
+            else:
+                result = fetch_random_row_by_offset(conn, None, rng)
             if result is None:
                 raise HTTPException(status_code=500, detail="No wines found in the database")
-    finally:
-        conn.close()
 
-    wine_record: WineRecord = dict(result)
-    LOG.info(f"Returning wine: {wine_record['name']}")
+    wine_record = decode_wine(dict(result), codec)
+    log_step("Returning wine: %s", wine_record["name"])
     return wine_record
 
 
@@ -340,100 +1849,1023 @@ async def serve_image():
     return FileResponse("./static/wine_logo_2.jpeg", media_type="image/jpeg")
 
 
-@app.get("/robots.txt", include_in_schema=False)
-def robots_txt():
-    body = f"User-agent: *\nAllow: /\nSitemap: {SITE_URL}/sitemap.xml\n"
-    return Response(content=body, media_type="text/plain")
+@dataclass(frozen=True)
+class PrerenderedResponse:
+    """A response body rendered once, with compressed variants and strong ETags."""
 
+    media_type: str
+    bodies: dict[str, bytes]  # content-coding -> body
+    etags: dict[str, str]  # content-coding -> quoted ETag
 
-@app.get("/sitemap.xml", include_in_schema=False)
-def sitemap_xml():
+    @classmethod
+    def build(cls, body: str, media_type: str) -> "PrerenderedResponse":
+        raw = body.encode("utf-8")
+        bodies = {"identity": raw, "gzip": gzip.compress(raw, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            bodies["br"] = brotli.compress(raw, quality=11)
+        digest = hashlib.sha256(raw).hexdigest()[:32]
+        etags = {coding: f'"{digest}"' if coding == "identity" else f'"{digest}-{coding}"' for coding in bodies}
+        return cls(media_type=media_type, bodies=bodies, etags=etags)
+
+    def to_response(self, request: Request) -> Response:
+        coding = negotiate_content_coding(request.headers.get("accept-encoding", ""), self.bodies)
+        headers = {
+            "ETag": self.etags[coding],
+            "Cache-Control": "public, max-age=3600",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in tags or tags & set(self.etags.values()):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(content=self.bodies[coding], media_type=self.media_type, headers=headers)
+
+
+def negotiate_content_coding(accept_encoding: str, available: dict[str, bytes]) -> str:
+    """Pick the best of br/gzip the client accepts (q > 0), else identity."""
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for coding in ("br", "gzip"):
+        if coding in available and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
+
+
+STATIC_RESPONSES: dict[str, PrerenderedResponse] = {}
+STATIC_RESPONSES_KEY: tuple | None = None
+STATIC_RESPONSES_LOCK = threading.Lock()
+
+
+def static_responses_key() -> tuple:
+    """Everything the static responses depend on; a change re-renders them."""
+    return (
+        SITE_URL,
+        settings.umami_enabled,
+        settings.umami_script_src,
+        settings.umami_website_id,
+        settings.umami_domains,
+        settings.umami_tag,
+    )
+
+
+def site_request(path: str) -> Request:
+    """Build a request for ``SITE_URL + path`` so templates can render outside a real request."""
+    site = urlsplit(SITE_URL)
+    default_port = 443 if site.scheme == "https" else 80
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": site.scheme,
+            "server": (site.hostname, site.port or default_port),
+            "path": path,
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", site.netloc.encode())],
+            "app": app,
+            "router": app.router,
+        }
+    )
+
+
+def render_robots_txt() -> str:
+    return f"User-agent: *\nAllow: /\nSitemap: {SITE_URL}/sitemap.xml\n"
+
+
+def render_sitemap_xml() -> str:
     urls = "\n".join(
         f"  <url><loc>{SITE_URL}{path}</loc><changefreq>weekly</changefreq><priority>0.8</priority></url>"
         for path in SITEMAP_PATHS
     )
-    body = f"""<?xml version="1.0" encoding="UTF-8"?>
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
 {urls}
 </urlset>
 """
-    return Response(content=body, media_type="application/xml")
 
 
-@app.get("/ai-wine-generator", response_class=HTMLResponse)
-@app.get("/fake-wine-name-generator", response_class=HTMLResponse)
-@app.get("/ai-wine-label-generator", response_class=HTMLResponse)
-@app.get("/wine-tasting-note-generator", response_class=HTMLResponse)
-@app.get("/about", response_class=HTMLResponse)
-def seo_page(request: Request):
-    page = SEO_PAGES[request.url.path]
-    return templates.TemplateResponse(
-        "page.html",
+def render_seo_page(path: str) -> str:
+    page = SEO_PAGES[path]
+    return templates.get_template("page.html").render(
         {
-            "request": request,
+            "request": site_request(path),
             "page": page,
             **get_seo_context(
-                request.url.path,
+                path,
                 title=str(page["title"]),
                 description=str(page["description"]),
             ),
             **get_umami_context(),
-        },
+        }
     )
 
 
-@app.get("/", response_class=HTMLResponse)
-@app.get("/wine", response_class=HTMLResponse)
-def main(request: Request):
-    LOG.info("Starting request")
+def prerender_static_responses() -> dict[str, PrerenderedResponse]:
+    """Render robots.txt, sitemap.xml and the SEO pages, reusing them while their inputs are unchanged."""
+    global STATIC_RESPONSES, STATIC_RESPONSES_KEY
+    key = static_responses_key()
+    if key == STATIC_RESPONSES_KEY:
+        return STATIC_RESPONSES
+    with STATIC_RESPONSES_LOCK:
+        if key != STATIC_RESPONSES_KEY:
+            responses = {
+                "/robots.txt": PrerenderedResponse.build(render_robots_txt(), "text/plain"),
+                "/sitemap.xml": PrerenderedResponse.build(render_sitemap_xml(), "application/xml"),
+            }
+            for path in SEO_PAGES:
+                responses[path] = PrerenderedResponse.build(render_seo_page(path), "text/html")
+            STATIC_RESPONSES, STATIC_RESPONSES_KEY = responses, key
+            LOG.info(f"Pre-rendered {len(responses)} static responses")
+    return STATIC_RESPONSES
+
+
+@app.get("/robots.txt", include_in_schema=False)
+async def robots_txt(request: Request):
+    return prerender_static_responses()["/robots.txt"].to_response(request)
+
+
+@app.get("/sitemap.xml", include_in_schema=False)
+async def sitemap_xml(request: Request):
+    return prerender_static_responses()["/sitemap.xml"].to_response(request)
+
+
+@app.get("/ai-wine-generator", response_class=HTMLResponse)
+@app.get("/fake-wine-name-generator", response_class=HTMLResponse)
+@app.get("/ai-wine-label-generator", response_class=HTMLResponse)
+@app.get("/wine-tasting-note-generator", response_class=HTMLResponse)
+@app.get("/about", response_class=HTMLResponse)
+async def seo_page(request: Request):
+    return prerender_static_responses()[request.url.path].to_response(request)
+
+
+def sample_wines_batch(categories: list[WineCategory], rng: random.Random = RNG) -> list[WineRecord]:
+    """Sample one wine per entry of ``categories`` (any category when one has no wines).
+
+    With ``category_ranges`` all rows come back from a single query.
+    """
+    if WINE_CATALOG is not None:
+        catalog = WINE_CATALOG
+        wines = [catalog.sample(category, rng) or catalog.sample(None, rng) for category in categories]
+    else:
+        pool = get_db_pool()
+        with pool.connection() as conn:
+            ranges = get_category_ranges(conn, pool.db_path)
+            codec = get_description_codec(conn, pool.db_path)
+            if ranges:
+                total = (1, sum(count for _, count in ranges.values()))
+                rowids = []
+                for category in categories:
+                    first_rowid, count = ranges.get(category.display_name, (0, 0))
+                    if count <= 0:
+                        CATEGORY_FALLBACKS.inc(category.display_name)
+                        first_rowid, count = total
+                    rowids.append(first_rowid + rng.randrange(count) if count else 0)
+                rows = conn.execute(
+                    "SELECT rowid AS rowid_, * FROM wine_descriptions WHERE rowid IN (SELECT value FROM json_each(?))",
+                    (json.dumps(rowids),),
+                ).fetchall()
+                by_rowid = {row["rowid_"]: row for row in rows}
+                wines = [dict(by_rowid[rowid]) if rowid in by_rowid else None for rowid in rowids]
+                for wine in wines:
+                    if wine is not None:
+                        del wine["rowid_"]
+                        decode_wine(wine, codec)
+            else:
+                wines = []
+                for category in categories:
+                    row = fetch_random_row_by_offset(conn, category.display_name, rng)
+                    row = row or fetch_random_row_by_offset(conn, None, rng)
+                    wines.append(decode_wine(dict(row), codec) if row is not None else None)
+
+    if any(wine is None for wine in wines):
+        raise HTTPException(status_code=500, detail="No wines found in the database")
+    return wines  # type: ignore[return-value]
+
+
+SEARCH_INDEX: dict[Path, bool] = {}
+
+
+def has_search_index(conn: sqlite3.Connection, db_path: Path) -> bool:
+    """Whether the database has the ``wine_fts`` index (``scripts/csv_to_sqlite.py --fts``)."""
+    if db_path not in SEARCH_INDEX:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'wine_fts'").fetchone()
+        SEARCH_INDEX[db_path] = row is not None
+        if row is None:
+            LOG.warning(f"No wine_fts table in {db_path}; /search is unavailable")
+    return SEARCH_INDEX[db_path]
+
+
+def fts_query(q: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix.
+
+    Words are quoted, so FTS5 operators and column filters in user input are matched as text.
+    """
+    terms = re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    if len(terms[-1]) >= 2:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+# SQLite VM instructions between checks of the search time budget
+SEARCH_PROGRESS_INSTRUCTIONS = 1000
+
+
+def ranked_matches(conn: sqlite3.Connection, match: str, limit: int) -> list[int]:
+    """Rowids of the ``limit`` best matches for ``match`` by BM25 rank, best first.
+
+    At most about ``search_max_candidates`` matches are scored. When more rows match, only those
+    whose rowid is a multiple of ``ceil(rows / search_max_candidates)`` are: an even sample of the
+    table, where the first matches would all come from the first categories (rowids are clustered
+    by category). FTS5 still walks the whole doclist of a common word, but skips scoring most rows.
+    """
+    max_candidates = settings.search_max_candidates
+    probe = conn.execute(
+        "SELECT COUNT(*) FROM (SELECT rowid FROM wine_fts WHERE wine_fts MATCH ? LIMIT ?)", (match, max_candidates + 1)
+    ).fetchone()[0]
+    if probe <= max_candidates:
+        rows = conn.execute(
+            "SELECT rowid FROM wine_fts WHERE wine_fts MATCH ? ORDER BY rank, rowid LIMIT ?", (match, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    max_rowid = conn.execute("SELECT MAX(rowid) FROM wine_descriptions").fetchone()[0]
+    step = -(-max_rowid // max_candidates)
+    # Sorted here: an ORDER BY rank would let FTS5 score every match before the rowid filter applies
+    rows = conn.execute(
+        "SELECT rank, rowid FROM wine_fts WHERE wine_fts MATCH ? AND rowid % ? = 0", (match, step)
+    ).fetchall()
+    return [rowid for _, rowid in sorted((row[0], row[1]) for row in rows)[:limit]]
+
+
+@functools.lru_cache(maxsize=SEARCH_CACHE_SIZE)
+def search_wines_cached(db_path: Path, match: str, page: int) -> tuple[tuple[WineRecord, ...], bool]:
+    pool = get_search_pool()
+    with pool.connection() as conn:
+        if not has_search_index(conn, pool.db_path):
+            raise HTTPException(status_code=503, detail="Search index not available")
+        codec = get_description_codec(conn, pool.db_path)
+        deadline = time.monotonic() + settings.search_timeout
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, SEARCH_PROGRESS_INSTRUCTIONS)
+        try:
+            rowids = ranked_matches(conn, match, page * SEARCH_PAGE_SIZE + 1)
+            page_rowids = rowids[(page - 1) * SEARCH_PAGE_SIZE : page * SEARCH_PAGE_SIZE]
+            # Descriptions are only read for the page
+            rows = conn.execute(
+                """
+                SELECT rowid AS rowid_, id, name, category_2, origin, description FROM wine_descriptions
+                WHERE rowid IN (SELECT value FROM json_each(?))
+                """,
+                (json.dumps(page_rowids),),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            if e.sqlite_errorcode != sqlite3.SQLITE_INTERRUPT:
+                raise
+            SEARCH_REJECTED.inc("timeout")
+            LOG.warning("Search for %s stopped after %ss", match, settings.search_timeout)
+            raise HTTPException(status_code=503, detail="Search timed out", headers={"Retry-After": "1"}) from e
+        finally:
+            conn.set_progress_handler(None, 0)
+    by_rowid = {row["rowid_"]: row for row in rows}
+    results = []
+    for rowid in page_rowids:
+        wine = dict(by_rowid[rowid])
+        del wine["rowid_"]
+        results.append(decode_wine(wine, codec))
+    return tuple(results), len(rowids) > page * SEARCH_PAGE_SIZE
+
+
+def search_wines(q: str, page: int = 1) -> tuple[list[WineRecord], bool]:
+    """Return one page of wines matching ``q`` by BM25 rank, and whether there is a next page."""
+    match = fts_query(q)
+    if not match:
+        return [], False
+    with STAGE_SECONDS.time("search"):
+        results, has_more = search_wines_cached(DB_PATH.resolve(), match, page)
+    return list(results), has_more
+
+
+async def search_wines_async(q: str, page: int) -> tuple[list[WineRecord], bool]:
+    """``search_wines`` on SEARCH_EXECUTOR; 503 when ``search_queue_size`` searches are already in flight."""
+    if not SEARCH_SLOTS.acquire(blocking=False):
+        SEARCH_REJECTED.inc("busy")
+        raise HTTPException(status_code=503, detail="Search busy", headers={"Retry-After": "1"})
+    try:
+        return await run_blocking(SEARCH_EXECUTOR, search_wines, q, page)
+    finally:
+        SEARCH_SLOTS.release()
+
+
+def dumps_json(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def label_image(image_path: str) -> tuple[str, str]:
+    """``src`` and ``srcset`` of the label ``<img>`` for a label URL (derivatives when enabled)."""
+    if LABEL_DERIVATIVES and image_path.startswith(IMAGE_DIR):
+        label_path = image_path[len(IMAGE_DIR) :]
+        srcset = ", ".join(
+            f"{label_derivative_url(width, label_path)} {width // LABEL_DISPLAY_WIDTH}x"
+            for width in LABEL_DERIVATIVE_WIDTHS
+        )
+        return label_derivative_url(LABEL_DISPLAY_WIDTH, label_path), srcset
+    return image_path, f"{image_path} 1x"
+
+
+def label_preload_links(image_path: str) -> list[bytes]:
+    """``Link`` values that start the label download (and the MinIO connection) early."""
+    src, srcset = label_image(image_path)
+    links = [f"<{IMAGE_ORIGIN}>; rel=preconnect"] if src.startswith(IMAGE_ORIGIN) else []
+    preload = f"<{quote(src, safe=':/%')}>; rel=preload; as=image"
+    if src != image_path:
+        # Derivatives: let the browser preload the width the <img> srcset will pick
+        preload += f'; imagesrcset="{srcset}"'
+    return [link.encode("latin-1") for link in [*links, preload]]
+
+
+async def send_early_hints(request: Request, image_path: str) -> None:
+    early_hints = request.scope.get(EARLY_HINTS_SCOPE_KEY)
+    if early_hints is not None:
+        await early_hints(label_preload_links(image_path))
+
+
+def wine_page_fields(image_path: str, wine: WineRecord) -> dict[str, Any]:
+    image, srcset = label_image(image_path)
+    return {
+        "w_name": wine["name"],
+        "w_category_2": wine["category_2"],
+        "w_origin": wine["origin"],
+        "w_description": wine["description"],
+        "w_image": image,
+        "w_srcset": srcset,
+    }
+
+
+def wine_page_context(request: Request, fields: dict[str, Any]) -> dict:
+    return {
+        "request": request,
+        **fields,
+        "label_derivatives": LABEL_DERIVATIVES,
+        **get_seo_context("/"),
+        **get_umami_context(),
+    }
+
+
+WINE_PAGE_FIELDS = ("w_name", "w_category_2", "w_origin", "w_description", "w_image", "w_srcset")
+WINE_PAGE_PLACEHOLDER = re.compile("\x00(w_[a-z0-9_]+)\x00")
+MAX_WINE_PAGE_SKELETONS = 16
+
+
+class WinePageSkeleton:
+    """``index.html`` rendered once with placeholders for the per-wine fields.
+
+    The head, JSON-LD and analytics blocks only depend on settings and the base URL, so a
+    wine page is its fields HTML-escaped (as autoescaped ``{{ w_* }}`` would) and joined
+    with the static segments.
+    """
+
+    def __init__(self, request: Request):
+        placeholders = {field: f"\x00{field}\x00" for field in WINE_PAGE_FIELDS}
+        html = templates.get_template("index.html").render(wine_page_context(request, placeholders))
+        parts = WINE_PAGE_PLACEHOLDER.split(html)
+        self.segments = parts[0::2]
+        self.fields = parts[1::2]
+        if any("\x00" in segment or "\\u0000" in segment for segment in self.segments):
+            raise ValueError("index.html uses a w_* field in an expression other than plain {{ w_* }} output")
+
+    def render(self, fields: dict[str, Any]) -> str:
+        out = [self.segments[0]]
+        for field, segment in zip(self.fields, self.segments[1:], strict=True):
+            out.append(escape(fields[field]))
+            out.append(segment)
+        return "".join(out)
+
+
+WINE_PAGE_SKELETONS: dict[str, WinePageSkeleton] = {}
+
+
+def wine_page_skeleton(request: Request) -> WinePageSkeleton:
+    """Skeleton for the request's base URL, which the favicon URL is built from."""
+    base_url = str(request.base_url)
+    skeleton = WINE_PAGE_SKELETONS.get(base_url)
+    if skeleton is None:
+        if len(WINE_PAGE_SKELETONS) >= MAX_WINE_PAGE_SKELETONS:
+            # The base URL comes from the Host header, so keep the cache bounded
+            WINE_PAGE_SKELETONS.clear()
+        skeleton = WINE_PAGE_SKELETONS[base_url] = WinePageSkeleton(request)
+    return skeleton
+
+
+def render_wine_page(request: Request, image_path: str, wine: WineRecord) -> str:
+    skeleton = wine_page_skeleton(request)
+    with STAGE_SECONDS.time("render"):
+        return skeleton.render(wine_page_fields(image_path, wine))
+
 
+def sample_wine(rng: random.Random = RNG) -> tuple[str, WineRecord]:
+    """Pick a label and a matching wine; returns (image URL, wine)."""
     # Sample a random wine label
-    label_cat_2, label_path = sample_label_from_minio()
+    with STAGE_SECONDS.time("label_sample"):
+        label_cat_2, label_path = sample_label_from_minio(rng)
     # Use direct MinIO URL instead of proxy endpoint
     image_path: str = f"{IMAGE_DIR}{label_path}"
-    LOG.info(f"Selected image path: {image_path}")
+    log_step("Selected image path: %s", image_path)
 
-    wine: WineRecord = sample_from_sqlite(label_cat_2)
-    LOG.info(f"Returning description for: {wine['name']}")
+    with STAGE_SECONDS.time("sqlite_sample"):
+        wine: WineRecord = sample_from_sqlite(label_cat_2, rng)
+    log_step("Returning description for: %s", wine["name"])
+    return image_path, wine
 
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "w_name": wine["name"],
-            "w_category_2": wine["category_2"],
-            "w_origin": wine["origin"],
-            "w_description": wine["description"],
-            "w_image": image_path,
-            **get_seo_context("/"),
-            **get_umami_context(),
-        },
+
+async def sample_wine_async(rng: random.Random = RNG, request: Request | None = None) -> tuple[str, WineRecord]:
+    """``sample_wine`` with the MinIO and SQLite work moved off the event loop.
+
+    With ``request``, the picked label is announced as Early Hints before the wine is looked up.
+    """
+    if not BOTTLE_LIST:
+        await run_blocking(MINIO_EXECUTOR, load_bottle_list)
+    with STAGE_SECONDS.time("label_sample"):
+        label_cat_2, label_path = sample_label_from_minio(rng)
+    image_path: str = f"{IMAGE_DIR}{label_path}"
+    log_step("Selected image path: %s", image_path)
+    if request is not None:
+        await send_early_hints(request, image_path)
+
+    # The in-memory catalog is cheaper to sample than to hand off to a thread
+    with STAGE_SECONDS.time("sqlite_sample"):
+        if WINE_CATALOG is not None:
+            wine: WineRecord = sample_from_sqlite(label_cat_2, rng)
+        else:
+            wine = await run_blocking(DB_EXECUTOR, sample_from_sqlite, label_cat_2, rng)
+    log_step("Returning description for: %s", wine["name"])
+    return image_path, wine
+
+
+def render_random_wine_page() -> tuple[str, str]:
+    """A random wine page and its label URL (for the preload hints)."""
+    image_path, wine = sample_wine()
+    return image_path, render_wine_page(site_request("/"), image_path, wine)
+
+
+class WinePagePool:
+    """Ring buffer of fully rendered random wine pages, kept full by a background thread.
+
+    Each page is kept with its label URL so handlers can still send its preload hints. Handlers
+    pop a ready page and fall back to rendering inline when the buffer is empty.
+    """
+
+    def __init__(self, depth: int, refill_per_second: float, render: Callable[[], tuple[str, str]]):
+        if refill_per_second <= 0:
+            raise ValueError(f"refill_per_second must be greater than 0, got {refill_per_second}")
+        self.depth = depth
+        self.refill_interval = 1.0 / refill_per_second
+        self._render = render
+        self._pages: deque[tuple[str, bytes]] = deque(maxlen=depth)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.hits = 0
+        self.misses = 0
+        self.rendered = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="wine-page-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def pop(self) -> tuple[str, bytes] | None:
+        try:
+            page = self._pages.popleft()
+        except IndexError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return page
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if len(self._pages) < self.depth:
+                try:
+                    image_path, page = self._render()
+                    self._pages.append((image_path, page.encode("utf-8")))
+                    with self._lock:
+                        self.rendered += 1
+                except Exception as e:
+                    with self._lock:
+                        self.errors += 1
+                    LOG.warning(f"Wine page pool render failed: {e}")
+                    self._stop.wait(1.0)
+            self._stop.wait(self.refill_interval)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            served = self.hits + self.misses
+            return {
+                "depth": self.depth,
+                "available": len(self._pages),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / served if served else 0.0,
+                "rendered": self.rendered,
+                "errors": self.errors,
+            }
+
+
+WINE_PAGE_POOL: WinePagePool | None = None
+
+
+def start_wine_page_pool() -> None:
+    global WINE_PAGE_POOL
+    WINE_PAGE_POOL = WinePagePool(
+        settings.page_pool_depth, settings.page_pool_refill_per_second, render_random_wine_page
     )
+    WINE_PAGE_POOL.start()
+    LOG.info(f"Started wine page pool (depth {settings.page_pool_depth})")
 
 
-@app.get("/health", status_code=status.HTTP_200_OK)
-async def health_check():
-    health_status = {"database": "unhealthy", "minio": "unhealthy"}
+def require_startup_complete() -> None:
+    if not STARTUP_COMPLETE.is_set():
+        raise HTTPException(status_code=503, detail="Starting up", headers={"Retry-After": "5"})
 
-    # Check database connection
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT 1")
-        conn.close()
-        health_status["database"] = "healthy"
-    except Exception as e:
-        LOG.error(f"Database health check failed: {e}")
 
-    # Check MinIO connection
+async def startup_fallback_page(request: Request) -> HTMLResponse:
+    """Wine page for requests that arrive while BACKGROUND_STARTUP is still loading data."""
+    if not settings.startup_fallback:
+        require_startup_complete()
+    await send_early_hints(request, FALLBACK_IMAGE)
+    wine = FALLBACK_WINES[RNG.randrange(len(FALLBACK_WINES))]
+    page = render_wine_page(request, FALLBACK_IMAGE, wine)
+    return HTMLResponse(content=page, headers={"Cache-Control": "no-store"})
+
+
+@app.get("/", response_class=HTMLResponse)
+@app.get("/wine", response_class=HTMLResponse)
+async def main(request: Request):
+    log_step("Starting request")
+    if not STARTUP_COMPLETE.is_set():
+        return await startup_fallback_page(request)
+
+    if settings.permalink_redirect:
+        seed = RNG.randrange(settings.permalink_seed_space)
+        return RedirectResponse(f"/wine/{seed}", status_code=302, headers={"Cache-Control": "no-store"})
+
+    if WINE_PAGE_POOL is not None:
+        pooled = WINE_PAGE_POOL.pop()
+        if pooled is not None:
+            image_path, page = pooled
+            await send_early_hints(request, image_path)
+            return HTMLResponse(content=page)
+
+    return HTMLResponse(content=render_wine_page(request, *await sample_wine_async(request=request)))
+
+
+@app.get("/wine/{seed}", response_class=HTMLResponse)
+async def wine_permalink(request: Request, seed: int):
+    """Render the wine for ``seed``: same label and description for the same data, so edges can cache it."""
+    if not 0 <= seed <= MAX_PERMALINK_SEED:
+        raise HTTPException(status_code=404, detail="Wine not found")
+    if not STARTUP_COMPLETE.is_set():
+        # Not the seed's wine, so it must not be cached as the permalink
+        return await startup_fallback_page(request)
+    page = render_wine_page(request, *await sample_wine_async(random.Random(seed), request))
+    return HTMLResponse(content=page, headers={"Cache-Control": f"public, max-age={settings.permalink_max_age}"})
+
+
+@app.get("/label/{width}/{label_path:path}")
+async def label_derivative(width: int, label_path: str):
+    """A bottle label scaled to one of ``LABEL_DERIVATIVE_WIDTHS`` as WebP, created on first request."""
+    if not LABEL_DERIVATIVES or width not in LABEL_DERIVATIVE_WIDTHS or not is_known_label(label_path):
+        raise HTTPException(status_code=404, detail="Label not found")
+    path = label_derivative_path(width, label_path)
+    if not path.exists():
+        with STAGE_SECONDS.time("label_derivative"):
+            path = await run_blocking(MINIO_EXECUTOR, build_label_derivative, width, label_path)
+    return FileResponse(path, media_type="image/webp", headers={"Cache-Control": LABEL_DERIVATIVE_CACHE_CONTROL})
+
+
+def sample_api_wines(labels: Sequence[BottleInfo], n: int) -> bytes:
+    """``n`` random wines paired with labels picked from ``labels``, as a JSON array."""
+    picked = [labels[RNG.randrange(len(labels))] for _ in range(n)]
+    wines = sample_wines_batch([WineCategory(label_cat_2) for label_cat_2, _ in picked])
+    return dumps_json(
+        [
+            {**wine, "label_category": label_cat_2, "image": f"{IMAGE_DIR}{label_path}"}
+            for (label_cat_2, label_path), wine in zip(picked, wines, strict=True)
+        ]
+    )
+
+
+@app.get("/api/wines")
+async def api_wines(
+    n: int = Query(10, ge=1, le=MAX_API_WINES),
+    category: int | None = Query(None, ge=1, le=len(WineCategory), description="WineCategory value"),
+):
+    """Return ``n`` random wines, each paired with a bottle label of its category.
+
+    Sampling and encoding run on the database executor. Above ``API_STREAM_CHUNK`` wines the
+    array is sampled and sent one chunk at a time; an error after the first chunk ends the
+    response early, as the status has already been sent.
+    """
+    require_startup_complete()
+    if not BOTTLE_LIST:
+        await run_blocking(MINIO_EXECUTOR, load_bottle_list)
+    labels = get_labels_by_category().get(category, []) if category else BOTTLE_LIST
+    if not labels:
+        raise HTTPException(status_code=404, detail=f"No bottle labels for category {category}")
+
+    first = await run_blocking(DB_EXECUTOR, sample_api_wines, labels, min(n, API_STREAM_CHUNK))
+    if n <= API_STREAM_CHUNK:
+        return Response(content=first, media_type="application/json")
+
+    async def stream_items() -> AsyncIterator[bytes]:
+        yield first[:-1]
+        for start in range(API_STREAM_CHUNK, n, API_STREAM_CHUNK):
+            chunk = await run_blocking(DB_EXECUTOR, sample_api_wines, labels, min(API_STREAM_CHUNK, n - start))
+            yield b"," + chunk[1:-1]
+        yield b"]"
+
+    return StreamingResponse(stream_items(), media_type="application/json")
+
+
+@app.get("/search", response_class=HTMLResponse)
+async def search_page(
+    request: Request,
+    q: str = Query("", max_length=200),
+    page: int = Query(1, ge=1, le=MAX_SEARCH_PAGE),
+):
+    require_startup_complete()
+    results, has_more = await search_wines_async(q, page) if q else ([], False)
+    context = {
+        "request": request,
+        "query": q,
+        "page_number": page,
+        "results": results,
+        "has_more": has_more,
+        **get_seo_context("/search", title=f"{q} - Wine search" if q else "Wine search"),
+        **get_umami_context(),
+    }
+    return templates.TemplateResponse("search.html", context)
+
+
+@app.get("/api/search")
+async def api_search(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1, le=MAX_SEARCH_PAGE),
+):
+    """Full-text search over wine names and descriptions, best matches first."""
+    require_startup_complete()
+    results, has_more = await search_wines_async(q, page)
+    return Response(
+        content=dumps_json({"query": q, "page": page, "results": results, "has_more": has_more}),
+        media_type="application/json",
+    )
+
+
+def collect_db_pool_gauges() -> Iterable[tuple[LabelValues, float]]:
+    if DB_POOL is not None:
+        stats = DB_POOL.stats()
+        yield from [
+            (("size",), stats["size"]),
+            (("idle",), stats["idle"]),
+            (("in_use",), stats["size"] - stats["idle"]),
+        ]
+
+
+def db_pool_total(stat: str) -> Callable[[], Iterable[tuple[LabelValues, float]]]:
+    def collect() -> Iterable[tuple[LabelValues, float]]:
+        with DB_POOL_LOCK:
+            current = DB_POOL.stats()[stat] if DB_POOL is not None else 0
+            return [((), float(RETIRED_DB_POOL_STATS[stat] + current))]
+
+    return collect
+
+
+def collect_page_pool_gauges() -> Iterable[tuple[LabelValues, float]]:
+    if WINE_PAGE_POOL is not None:
+        stats = WINE_PAGE_POOL.stats()
+        yield from [(("depth",), stats["depth"]), (("available",), stats["available"])]
+
+
+def page_pool_total(stat: str) -> Callable[[], Iterable[tuple[LabelValues, float]]]:
+    def collect() -> Iterable[tuple[LabelValues, float]]:
+        return [((), float(WINE_PAGE_POOL.stats()[stat]))] if WINE_PAGE_POOL is not None else []
+
+    return collect
+
+
+METRICS += [
+    CallbackMetric("wine_db_pool", "SQLite connection pool connections.", "gauge", ("stat",), collect_db_pool_gauges),
+    CallbackMetric(
+        "wine_db_pool_checkouts_total", "SQLite connections checked out.", "counter", (), db_pool_total("checkouts")
+    ),
+    CallbackMetric(
+        "wine_db_pool_timeouts_total",
+        "Requests that timed out waiting for a SQLite connection.",
+        "counter",
+        (),
+        db_pool_total("timeouts"),
+    ),
+    CallbackMetric(
+        "wine_db_pool_wait_seconds_total",
+        "Time spent waiting for a SQLite connection.",
+        "counter",
+        (),
+        db_pool_total("wait_seconds_total"),
+    ),
+    CallbackMetric("wine_page_pool", "Pre-rendered wine page pool size.", "gauge", ("stat",), collect_page_pool_gauges),
+    CallbackMetric(
+        "wine_page_pool_hits_total", "Wine pages served from the pool.", "counter", (), page_pool_total("hits")
+    ),
+    CallbackMetric(
+        "wine_page_pool_misses_total",
+        "Wine page requests that found the pool empty.",
+        "counter",
+        (),
+        page_pool_total("misses"),
+    ),
+    CallbackMetric(
+        "wine_page_pool_rendered_total",
+        "Wine pages rendered into the pool.",
+        "counter",
+        (),
+        page_pool_total("rendered"),
+    ),
+    CallbackMetric(
+        "wine_page_pool_errors_total", "Failed wine page pool renders.", "counter", (), page_pool_total("errors")
+    ),
+    CallbackMetric("wine_bottle_labels", "Loaded bottle labels.", "gauge", (), lambda: [((), len(BOTTLE_LIST))]),
+    CallbackMetric(
+        "wine_log_records_dropped_total",
+        "Log records dropped because the log queue was full.",
+        "counter",
+        (),
+        lambda: [((), LOG_QUEUE_HANDLER.dropped if LOG_QUEUE_HANDLER is not None else 0)],
+    ),
+]
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body = "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+class NotReadyYet(Exception):
+    """Raised by a health check whose dependency is still loading rather than failing."""
+
+
+def check_database() -> None:
+    if not STARTUP_COMPLETE.is_set():
+        raise NotReadyYet("database still loading")
+    with get_db_pool().connection() as conn:
+        conn.execute("SELECT 1")
+
+
+def check_minio() -> None:
     try:
-        minio_client = get_minio_client()
-        minio_client.list_buckets()
-        health_status["minio"] = "healthy"
-    except Exception as e:
-        LOG.error(f"MinIO health check failed: {e}")
+        get_minio_client().list_buckets()
+    except Exception:
+        MINIO_ERRORS.inc("health_check")
+        raise
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    healthy: bool
+    checked_at: float  # Unix time
+    latency_seconds: float
+    error: str | None = None
+
+
+class HealthProber:
+    """Runs each health check on its own background thread and keeps the latest result.
+
+    Health endpoints read these results from memory, so polling them costs nothing and a slow
+    dependency only delays its own result.
+    """
+
+    def __init__(self, checks: dict[str, Callable[[], None]], interval: float):
+        self.checks = checks
+        self.interval = interval
+        self.results: dict[str, ProbeResult] = {}
+
+    def probe(self, name: str) -> ProbeResult:
+        start = time.perf_counter()
+        try:
+            self.checks[name]()
+            result = ProbeResult(True, time.time(), time.perf_counter() - start)
+        except NotReadyYet as e:
+            LOG.info(f"Health check {name} not ready: {e}")
+            result = ProbeResult(False, time.time(), time.perf_counter() - start, str(e))
+        except Exception as e:
+            LOG.error(f"Health check {name} failed: {e}")
+            result = ProbeResult(False, time.time(), time.perf_counter() - start, str(e))
+        self.results[name] = result
+        return result
+
+    def start(self) -> None:
+        for name in self.checks:
+            threading.Thread(target=self._run, args=(name,), name=f"health-{name}", daemon=True).start()
+
+    def _run(self, name: str) -> None:
+        while True:
+            self.probe(name)
+            if BACKGROUND_STOP.wait(self.interval):
+                return
+
+    def is_healthy(self, name: str) -> bool:
+        """Latest result is healthy and recent (a hung check counts as unhealthy)."""
+        result = self.results.get(name)
+        return result is not None and result.healthy and time.time() - result.checked_at < 3 * self.interval
+
+
+HEALTH_PROBER = HealthProber({"database": check_database, "minio": check_minio}, settings.health_probe_interval)
+
+
+@app.get("/health/live")
+async def health_live():
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    checks = {
+        name: {
+            "healthy": result.healthy,
+            "checked_at": result.checked_at,
+            "latency_ms": round(result.latency_seconds * 1000, 2),
+            "error": result.error,
+        }
+        for name, result in HEALTH_PROBER.results.items()
+    }
+    # Labels are served to browsers straight from MinIO, so only the database gates readiness
+    ready = STARTUP_COMPLETE.is_set() and bool(BOTTLE_LIST) and HEALTH_PROBER.is_healthy("database")
+    body = {
+        "status": "ready" if ready else "not ready",
+        "startup": "complete" if STARTUP_COMPLETE.is_set() else "loading",
+        "checks": checks,
+    }
+    if not ready:
+        raise HTTPException(status_code=503, detail=body)
+    return body
+
+
+@app.get("/health", status_code=status.HTTP_200_OK)
+async def health_check():
+    health_status = {
+        name: "healthy" if HEALTH_PROBER.is_healthy(name) else "unhealthy" for name in HEALTH_PROBER.checks
+    }
 
     if all(status == "healthy" for status in health_status.values()):
         return health_status
     else:
         raise HTTPException(status_code=503, detail=health_status)
+
+
+def require_profiling_token(request: Request) -> None:
+    """Allow the /debug endpoints only with ``Authorization: Bearer <PROFILING_TOKEN>``."""
+    if not settings.profiling_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = request.headers.get("authorization", "").strip().partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        token.strip().encode("utf-8"), settings.profiling_token.encode("utf-8")
+    ):
+        raise HTTPException(status_code=401, detail="Invalid profiling token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/debug/profile", include_in_schema=False)
+async def debug_profile(
+    request: Request,
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    sample_rate: float | None = Query(None, gt=0, le=1, description="share of page requests (PROFILE_SAMPLE_RATE)"),
+    idle: bool = Query(False, description="include threads waiting on locks, queues or the event loop"),
+):
+    """Profile live traffic for ``seconds`` and return folded stacks (``flamegraph.pl``, speedscope)."""
+    require_profiling_token(request)
+    rate = sample_rate if sample_rate is not None else settings.profile_sample_rate
+    folded, samples, requests = await anyio.to_thread.run_sync(
+        PROFILER.profile, seconds, interval_ms / 1000, rate, idle
+    )
+    LOG.info(f"Profiled {requests} requests over {seconds:.0f}s: {samples} stack samples")
+    return PlainTextResponse(
+        folded,
+        headers={
+            "Content-Disposition": f'attachment; filename="wine-profile-{int(time.time())}.folded"',
+            "X-Profile-Samples": str(samples),
+            "X-Profile-Requests": str(requests),
+        },
+    )
+
+
+# Previous snapshot, so each /debug/memory call reports growth since the last one
+MEMORY_BASELINE: tracemalloc.Snapshot | None = None
+MEMORY_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "*/linecache.py"),  # source lines read to format the previous report
+)
+
+
+def memory_inventory(types: int) -> dict[str, Any]:
+    """Sizes of the app's long-lived structures, plus the most common object types."""
+    inventory: dict[str, Any] = {
+        "bottle_labels": {"type": type(BOTTLE_LIST).__name__, "count": len(BOTTLE_LIST)},
+        "wine_catalog_rows": len(WINE_CATALOG) if WINE_CATALOG is not None else None,
+        "db_pool": DB_POOL.stats() if DB_POOL is not None else None,
+        "page_pool": WINE_PAGE_POOL.stats() if WINE_PAGE_POOL is not None else None,
+        "wine_page_skeletons": len(WINE_PAGE_SKELETONS),
+        "jinja_templates": len(templates.env.cache or {}),
+        "search_cache": search_wines_cached.cache_info()._asdict(),
+        "description_caches": {
+            str(path): codec.decode.cache_info()._asdict() for path, codec in DESCRIPTION_CODECS.items() if codec
+        },
+    }
+    if types:
+        objects = gc.get_objects()
+        inventory["gc_objects"] = len(objects)
+        inventory["object_types"] = dict(collections.Counter(type(obj).__name__ for obj in objects).most_common(types))
+        del objects
+    return inventory
+
+
+def memory_report(limit: int, key_type: str, types: int) -> dict[str, Any]:
+    global MEMORY_BASELINE
+    report: dict[str, Any] = {"tracing": tracemalloc.is_tracing()}
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(MEMORY_SNAPSHOT_FILTERS)
+        report["traced_bytes"] = current
+        report["traced_peak_bytes"] = peak
+        report["top"] = [
+            {"size_bytes": stat.size, "count": stat.count, "traceback": stat.traceback.format()}
+            for stat in snapshot.statistics(key_type)[:limit]
+        ]
+        if MEMORY_BASELINE is not None:
+            report["growth"] = [
+                {
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "traceback": stat.traceback.format(),
+                }
+                for stat in snapshot.compare_to(MEMORY_BASELINE, key_type)[:limit]
+            ]
+        MEMORY_BASELINE = snapshot
+    report["objects"] = memory_inventory(types)
+    return report
+
+
+@app.post("/debug/memory/start", include_in_schema=False)
+async def debug_memory_start(request: Request, frames: int = Query(10, ge=1, le=50)):
+    """Start tracemalloc (slows allocations and uses memory until stopped)."""
+    global MEMORY_BASELINE
+    require_profiling_token(request)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        MEMORY_BASELINE = None
+    return {"tracing": True, "frames": tracemalloc.get_traceback_limit()}
+
+
+@app.get("/debug/memory", include_in_schema=False)
+async def debug_memory(
+    request: Request,
+    limit: int = Query(25, ge=1, le=500),
+    key_type: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    types: int = Query(20, ge=0, le=200, description="most common object types to count (0 skips the gc walk)"),
+):
+    """Top allocations and growth since the previous call (while tracing), and the app's object inventory."""
+    require_profiling_token(request)
+    return await anyio.to_thread.run_sync(memory_report, limit, key_type, types)
+
+
+@app.post("/debug/memory/stop", include_in_schema=False)
+async def debug_memory_stop(request: Request):
+    global MEMORY_BASELINE
+    require_profiling_token(request)
+    tracemalloc.stop()
+    MEMORY_BASELINE = None
+    return {"tracing": False}
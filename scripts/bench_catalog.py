@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark random wine sampling: the SQL path vs the in-memory catalog.
+The SQL path is a rowid lookup via ``category_ranges`` (a COUNT/OFFSET scan with --no-ranges).
+Runs against a synthetic database (1M rows by default) so no MinIO access is needed.
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic_db import build_synthetic_db
+from synthetic_db import row_count
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+# app.py reads MinIO settings at import time; the benchmark never talks to MinIO
+os.environ.setdefault("MINIO_ENDPOINT", "localhost:9000")
+os.environ.setdefault("MINIO_ACCESS_KEY", "benchmark")
+os.environ.setdefault("MINIO_SECRET_KEY", "benchmark")
+
+import app  # noqa: E402
+
+
+def time_samples(label: str, samples: int) -> float:
+    categories = [category.value for category in app.WineCategory]
+    start = time.perf_counter()
+    for _ in range(samples):
+        app.sample_from_sqlite(random.choice(categories))
+    per_call = (time.perf_counter() - start) / samples
+    print(f"  {label:<10} {per_call * 1e6:>12.1f} µs/sample  ({samples} samples)")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sql-samples", type=int, default=1_000)
+    parser.add_argument("--catalog-samples", type=int, default=100_000)
+    parser.add_argument("--no-ranges", action="store_true", help="drop category_ranges from a copy of the database")
+    parser.add_argument(
+        "--db-path", type=Path, help="synthetic database (default: wine_bench_<rows>.db in the temp dir)"
+    )
+    args = parser.parse_args()
+
+    db_path = args.db_path or Path(tempfile.gettempdir()) / f"wine_bench_{args.rows}.db"
+    logging.getLogger("app").setLevel(logging.WARNING)
+    app.DB_PATH = build_synthetic_db(db_path, args.rows)
+    if args.no_ranges:
+        legacy_path = db_path.with_suffix(".no-ranges.db")
+        if row_count(legacy_path) != args.rows:
+            shutil.copyfile(db_path, legacy_path)
+            with sqlite3.connect(legacy_path) as conn:
+                conn.execute("DROP TABLE category_ranges")
+        app.DB_PATH = legacy_path
+
+    print(f"\nSampling from {args.rows:,} rows")
+    app.WINE_CATALOG = None
+    sql_time = time_samples("sql", args.sql_samples)
+
+    start = time.perf_counter()
+    app.load_wine_catalog()
+    print(f"  catalog load: {time.perf_counter() - start:.2f} s")
+    catalog_time = time_samples("catalog", args.catalog_samples)
+
+    print(f"\n  speedup: {sql_time / catalog_time:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark compressed description storage: database size and random wine sampling latency
+with plain TEXT descriptions vs zstd-dictionary-compressed ones (csv_to_sqlite.py --compress).
+Uses the real export with --csv, otherwise a synthetic dataset, so no MinIO access is needed.
+"""
+
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from csv_to_sqlite import read_csv_rows
+from csv_to_sqlite import write_sqlite_db
+from synthetic_db import generate_rows
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+# app.py reads MinIO settings at import time; the benchmark never talks to MinIO
+os.environ.setdefault("MINIO_ENDPOINT", "localhost:9000")
+os.environ.setdefault("MINIO_ACCESS_KEY", "benchmark")
+os.environ.setdefault("MINIO_SECRET_KEY", "benchmark")
+
+import app  # noqa: E402
+
+
+def build(db_path: Path, args: argparse.Namespace, compress: bool) -> Path:
+    if db_path.exists():
+        print(f"Reusing database: {db_path}")
+        return db_path
+    rows = read_csv_rows(str(args.csv)) if args.csv else generate_rows(args.rows)
+    write_sqlite_db(rows, str(db_path), compress=compress)
+    return db_path
+
+
+def description_bytes(db_path: Path) -> int:
+    with sqlite3.connect(db_path) as conn:
+        total = conn.execute("SELECT SUM(LENGTH(CAST(description AS BLOB))) FROM wine_descriptions").fetchone()[0]
+        try:
+            total += conn.execute("SELECT LENGTH(dictionary) FROM description_codec").fetchone()[0]
+        except sqlite3.OperationalError:
+            pass
+    return total or 0
+
+
+def time_samples(samples: int) -> float:
+    categories = [category.value for category in app.WineCategory]
+    start = time.perf_counter()
+    for _ in range(samples):
+        app.sample_from_sqlite(random.choice(categories))
+    return (time.perf_counter() - start) / samples
+
+
+def time_decode(db_path: Path, samples: int) -> float | None:
+    """Decode cost alone, for distinct descriptions (so the LRU never hits)."""
+    with app.get_db_pool().connection() as conn:
+        codec = app.get_description_codec(conn, db_path.resolve())
+        if codec is None:
+            return None
+        blobs = [row[0] for row in conn.execute("SELECT description FROM wine_descriptions LIMIT ?", (samples,))]
+    start = time.perf_counter()
+    for data in blobs:
+        codec._decode(data)
+    return (time.perf_counter() - start) / len(blobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--csv", type=Path, help="wine_data.csv export (default: synthetic rows)")
+    parser.add_argument("--rows", type=int, default=200_000, help="synthetic rows when --csv is not given")
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--workdir", type=Path, default=Path(tempfile.gettempdir()))
+    args = parser.parse_args()
+
+    logging.getLogger("app").setLevel(logging.WARNING)
+    name = args.csv.stem if args.csv else f"synthetic_{args.rows}"
+    results = []
+    for variant, compress in (("plain", False), ("zstd-dict", True)):
+        db_path = build(args.workdir / f"bench_{variant}_{name}.db", args, compress)
+        app.DB_PATH = db_path
+        app.swap_database(db_path)
+        time_samples(min(1_000, args.samples))  # warm the page cache and connections
+        results.append(
+            (
+                variant,
+                db_path.stat().st_size,
+                description_bytes(db_path),
+                time_samples(args.samples),
+                time_decode(db_path, args.samples),
+            )
+        )
+
+    print(f"\n{'storage':<10} {'file MB':>9} {'descr. MB':>10} {'µs/sample':>10} {'µs/decode':>10}")
+    for variant, file_size, descriptions, per_sample, per_decode in results:
+        decode = f"{per_decode * 1e6:>10.2f}" if per_decode is not None else f"{'-':>10}"
+        print(f"{variant:<10} {file_size / 1e6:>9.1f} {descriptions / 1e6:>10.1f} {per_sample * 1e6:>10.1f} {decode}")
+    (_, plain_size, plain_descriptions, plain_sample, _), (_, size, descriptions, sample, _) = results
+    print(
+        f"\n  file {plain_size / size:.2f}x smaller, descriptions {plain_descriptions / descriptions:.2f}x smaller, "
+        f"sampling {(sample - plain_sample) * 1e6:+.1f} µs"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Estimate how much Early Hints advance the largest contentful paint (the bottle label) of /.
+The app is driven in-process as an ASGI server advertising the http.response.early_hint extension,
+with labels served by scripts/fake_s3.py (--object-delay emulates the cross-origin connection and
+TTFB of MinIO). Per request it times the 103 hint, the response headers and the end of the body,
+downloads the label, and models when a browser would finish it:
+
+  no hints      body received + --parse-ms, then the label download
+  Link header   download starts with the response headers (servers without 103, e.g. uvicorn)
+  103 hints     download starts at the hint, sent before the wine is looked up and rendered
+
+and the label is painted no earlier than the HTML is parsed. --parse-ms is an input, not a
+measurement: without a browser, HTML transfer and parse time are not observed, and a hint can save
+at most that time plus the server time between the hint and the end of the body. The output gives
+the measured timings and the gain at the given --parse-ms and at 0 ms, so the share coming from the
+model is visible.
+"""
+
+import argparse
+import asyncio
+import http.client
+import logging
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from fake_s3 import FakeS3Server
+from loadtest import populate_store
+from synthetic_db import build_synthetic_db
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+PRELOAD_LINK = re.compile(rb"<([^>]+)>; rel=preload")
+
+
+def fetch_label(url: str) -> float:
+    """Download ``url`` over a new connection (like a browser's first cross-origin request); returns seconds."""
+    parts = urlsplit(url)
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(parts.netloc, timeout=30)
+    conn.request("GET", parts.path)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f"{url}: HTTP {response.status}")
+    return time.perf_counter() - start
+
+
+async def timed_request(asgi_app, path: str) -> dict[str, float | bytes]:
+    """Run one GET through the ASGI app; returns seconds from the start to each response event."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 80),
+        "extensions": {"http.response.early_hint": {}},
+    }
+    events: dict[str, float | bytes] = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        elapsed = time.perf_counter() - start
+        if message["type"] == "http.response.early_hint" and "hint" not in events:
+            events["hint"] = elapsed
+            events["links"] = b", ".join(message["links"])
+        elif message["type"] == "http.response.start":
+            events["headers"] = elapsed
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            events["body"] = elapsed
+
+    start = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    return events
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run(args: argparse.Namespace, asgi_app) -> list[dict[str, float]]:
+    """Measured seconds per request: 103 hint, response headers, end of body, label download."""
+    timings = []
+    for i in range(args.warmup + args.requests):
+        events = await timed_request(asgi_app, "/")
+        match = PRELOAD_LINK.search(events.get("links", b""))
+        if match is None:
+            raise RuntimeError("no preload hint; is EARLY_HINTS disabled?")
+        download = fetch_label(match.group(1).decode())
+        if i >= args.warmup:
+            timings.append(
+                {"hint": events["hint"], "headers": events["headers"], "body": events["body"], "download": download}
+            )
+    return timings
+
+
+def model_lcp(timings: list[dict[str, float]], parse: float) -> dict[str, list[float]]:
+    lcp: dict[str, list[float]] = {"no hints": [], "Link header": [], "103 hints": []}
+    for t in timings:
+        html_ready = t["body"] + parse
+        lcp["no hints"].append(html_ready + t["download"])
+        lcp["Link header"].append(max(html_ready, t["headers"] + t["download"]))
+        lcp["103 hints"].append(max(html_ready, t["hint"] + t["download"]))
+    return lcp
+
+
+def gains(lcp: dict[str, list[float]]) -> str:
+    baseline = statistics.median(lcp["no hints"])
+    return ", ".join(
+        f"{mode} {(baseline - statistics.median(lcp[mode])) * 1000:.1f} ms" for mode in ("Link header", "103 hints")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="synthetic database size")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--object-delay", type=float, default=50.0, help="ms the object server waits per request")
+    parser.add_argument("--parse-ms", type=float, default=20.0, help="modelled HTML transfer + parse time")
+    parser.add_argument("--workdir", type=Path, default=Path(tempfile.gettempdir()) / "wine_loadtest")
+    args = parser.parse_args()
+
+    args.workdir.mkdir(parents=True, exist_ok=True)
+    db_path = build_synthetic_db(args.workdir / f"synthetic_{args.rows}.db", args.rows)
+    run_dir = Path(tempfile.mkdtemp(prefix="hints_", dir=args.workdir))
+    populate_store(run_dir / "s3", db_path)
+    (run_dir / "data").mkdir()
+    store = FakeS3Server(run_dir / "s3", delay=args.object_delay / 1000)
+    store.start_in_thread()
+
+    # app.py reads its settings at import time
+    os.environ.update(
+        {
+            "MINIO_ENDPOINT": store.endpoint,
+            "MINIO_ACCESS_KEY": "benchmark",
+            "MINIO_SECRET_KEY": "benchmark",
+            "MINIO_SECURE": "false",
+            "DATA_DIR": str(run_dir / "data"),
+            "EARLY_HINTS": "true",
+        }
+    )
+    os.chdir(project_dir)
+    import app
+
+    logging.getLogger("app").setLevel(logging.WARNING)
+    try:
+        app.precompile_templates()
+        app.load_startup_data()
+        timings = asyncio.run(run(args, app.app))
+    finally:
+        app.BACKGROUND_STOP.set()
+        store.shutdown()
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    print(f"\nMeasured over {args.requests} requests ({args.object_delay:.0f} ms object server delay)")
+    print(f"{'':<16} {'p50 ms':>9} {'p90 ms':>9}")
+    for name in ("hint", "headers", "body", "download"):
+        values = [t[name] for t in timings]
+        print(f"{name:<16} {percentile(values, 0.5) * 1000:>9.1f} {percentile(values, 0.9) * 1000:>9.1f}")
+
+    lcp = model_lcp(timings, args.parse_ms / 1000)
+    print(f"\nModelled label paint time (HTML transfer + parse assumed to take --parse-ms {args.parse_ms:g} ms)")
+    print(f"{'':<16} {'p50 ms':>9} {'p90 ms':>9}")
+    for mode, values in lcp.items():
+        print(f"{mode:<16} {percentile(values, 0.5) * 1000:>9.1f} {percentile(values, 0.9) * 1000:>9.1f}")
+    print(f"\nEarlier than no hints at p50: {gains(lcp)}")
+    print(f"  with --parse-ms 0 (measured server time only): {gains(model_lcp(timings, 0.0))}")
+    print("  The gain is at most --parse-ms plus the server time after the hint; confirm it with a browser trace")
+
+
+if __name__ == "__main__":
+    main()
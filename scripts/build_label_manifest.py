@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Build the bottle label manifest and upload it to MinIO.
+The app loads this one small object at startup instead of listing the whole wine-bottles bucket.
+"""
+
+import io
+import json
+import os
+import re
+import sys
+from collections.abc import Iterable
+from datetime import UTC
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from minio import Minio
+
+# Load environment from parent directory
+project_dir = Path(__file__).parent.parent
+load_dotenv(project_dir / ".env")
+
+# Must match LABEL_MANIFEST_* in app.py
+LABELS_BUCKET = "wine-bottles"
+MANIFEST_BUCKET = "wine-data"
+MANIFEST_OBJECT = "bottle_manifest.json"
+MANIFEST_VERSION = 1
+# Must match WineCategory and the cat_<n>_ parsing in app.py
+CATEGORY_COUNT = 15
+LABEL_NAME_PATTERN = re.compile(r"cat_(\d+)_[^/]+")
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    return os.environ.get(name, str(default)).lower() in ("true", "1", "yes")
+
+
+def make_minio_client(**kwargs) -> Minio:
+    """Client for the MinIO in .env; ``MINIO_SECURE`` (default true) picks HTTPS, as in app.py."""
+    endpoint = os.environ.get("MINIO_ENDPOINT")
+    access_key = os.environ.get("MINIO_ACCESS_KEY")
+    secret_key = os.environ.get("MINIO_SECRET_KEY")
+
+    if not all([endpoint, access_key, secret_key]):
+        print("❌ Error: MinIO credentials not found in .env")
+        sys.exit(1)
+
+    return Minio(
+        endpoint, access_key=access_key, secret_key=secret_key, secure=env_flag("MINIO_SECURE", True), **kwargs
+    )
+
+
+def label_category(name: str) -> int | None:
+    """Category of a ``cat_<n>_...`` label name, or None when the app could not place it."""
+    match = LABEL_NAME_PATTERN.fullmatch(name)
+    if match is None or not 1 <= int(match.group(1)) <= CATEGORY_COUNT:
+        return None
+    return int(match.group(1))
+
+
+def manifest_labels(names: Iterable[str]) -> list[tuple[int, str]]:
+    """Sorted (category, object name) of the label names the app can place; others are skipped."""
+    labels = []
+    for name in names:
+        category = label_category(name)
+        if category is None:
+            print(f"  Skipping unexpected object: {name}")
+            continue
+        labels.append((category, name))
+    return sorted(labels)
+
+
+def list_labels(client: Minio) -> list[tuple[int, str]]:
+    """Return (category, object name) for every ``cat_<n>_...`` object in the labels bucket."""
+    return manifest_labels(obj.object_name or "" for obj in client.list_objects(LABELS_BUCKET, recursive=True))
+
+
+def build_manifest(labels: list[tuple[int, str]]) -> bytes:
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "generated_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "bucket": LABELS_BUCKET,
+        "labels": labels,
+    }
+    return json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+
+
+def upload_manifest(client: Minio, data: bytes) -> str:
+    """Upload the manifest and return its ETag."""
+    if not client.bucket_exists(MANIFEST_BUCKET):
+        print(f"Creating bucket: {MANIFEST_BUCKET}")
+        client.make_bucket(MANIFEST_BUCKET)
+    result = client.put_object(
+        MANIFEST_BUCKET, MANIFEST_OBJECT, io.BytesIO(data), len(data), content_type="application/json"
+    )
+    return result.etag
+
+
+def main():
+    client = make_minio_client()
+
+    print(f"Listing labels in {LABELS_BUCKET}...")
+    labels = list_labels(client)
+    data = build_manifest(labels)
+    etag = upload_manifest(client, data)
+
+    print("\n✅ Manifest uploaded!")
+    print(f"  Object: {MANIFEST_BUCKET}/{MANIFEST_OBJECT}")
+    print(f"  Labels: {len(labels):,}")
+    print(f"  Size: {len(data) / 1024:.1f} KB")
+    print(f"  ETag: {etag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,171 @@
 """
 Convert wine_data.csv to wine_data.db SQLite database.
 Optimized for read-only access with proper indexes.
+Rows are streamed into the database in chunked transactions, so memory stays bounded for any CSV size.
+With --compress, descriptions are stored zstd-compressed against a dictionary trained on them.
 """
 
+import argparse
+import collections
 import csv
+import io
+import itertools
+import multiprocessing
 import sqlite3
 import sys
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
 from pathlib import Path
 
+try:
+    import zstandard
+except ImportError:  # optional: only needed for --compress
+    zstandard = None
 
-def create_sqlite_db(csv_path: str, db_path: str):
+WineRow = tuple[str, str, str, str, str, str]
+
+CSV_COLUMNS = ("id", "name", "category_1", "category_2", "origin", "description")
+DEFAULT_CHUNK_SIZE = 50_000
+PROGRESS_INTERVAL = 2.0  # seconds between progress lines
+SHARD_BYTES = 8 * 1024 * 1024  # CSV bytes parsed per task when validating in parallel
+# Page cache used while building (negative = KiB); the sort for the clustered copy spills to temp files
+BUILD_CACHE_KIB = 65_536
+# Description compression (--compress): the codec name must match DESCRIPTION_CODEC in app.py
+DESCRIPTION_CODEC = "zstd-dict"
+DEFAULT_COMPRESS_LEVEL = 9
+DEFAULT_DICT_KIB = 112
+DICT_TRAINING_SAMPLES = 100_000  # descriptions sampled (evenly) to train the dictionary
+DECODE_BENCH_SAMPLES = 10_000
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def column_positions(header: list[str]) -> list[int]:
+    missing = [column for column in CSV_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+    return [header.index(column) for column in CSV_COLUMNS]
+
+
+def iter_csv_records(csv_path: str) -> Iterator[list[str]]:
+    """Yield raw CSV records in table column order, without loading the file."""
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        positions = column_positions(next(reader))
+        for record in reader:
+            yield [record[i] if i < len(record) else "" for i in positions]
+
+
+def iter_csv_shards(csv_path: str) -> Iterator[tuple[bytes, bytes]]:
+    """Yield (header line, shard) pairs of about SHARD_BYTES that each end on a record boundary.
+
+    Descriptions may contain quoted newlines, so a newline only ends a record when the number of
+    quote characters before it is even (escaped quotes are doubled and keep the parity).
+    """
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        carry = b""
+        while data := f.read(SHARD_BYTES):
+            data = carry + data
+            end = len(data)
+            while (newline := data.rfind(b"\n", 0, end)) >= 0 and data.count(b'"', 0, newline) % 2:
+                end = newline
+            if newline < 0:
+                carry = data
+                continue
+            yield header, data[: newline + 1]
+            carry = data[newline + 1 :]
+        if carry:
+            yield header, carry
+
+
+def parse_csv_shard(shard: tuple[bytes, bytes]) -> tuple[list[WineRow], int]:
+    header, data = shard
+    reader = csv.reader(io.StringIO((header + data).decode("utf-8"), newline=""))
+    positions = column_positions(next(reader))
+    return validate_records([[record[i] if i < len(record) else "" for i in positions] for record in reader])
+
+
+def validate_records(records: list[list[str]]) -> tuple[list[WineRow], int]:
+    """Drop records without an id or category_2; return (rows, rejected count).
+
+    Only those two key fields are stripped of surrounding whitespace; the other fields are stored as exported.
+    """
+    rows = []
+    for record in records:
+        row_id, category_2 = record[0].strip(), record[3].strip()
+        if row_id and category_2:
+            rows.append((row_id, record[1], record[2], category_2, record[4], record[5]))
+    return rows, len(records) - len(rows)
+
+
+def read_csv_rows(csv_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1) -> Iterator[WineRow]:
+    """Stream validated wine rows from the exported CSV in table column order.
+
+    With ``workers`` > 1, shards of the file are parsed and validated on a process pool, at most
+    two per worker in flight, and their rows are yielded in file order.
+    """
+    print(f"Reading CSV from: {csv_path}")
+    rejected = 0
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            pending = collections.deque()
+            for shard in iter_csv_shards(csv_path):
+                pending.append(pool.apply_async(parse_csv_shard, (shard,)))
+                if len(pending) >= 2 * workers:
+                    rows, dropped = pending.popleft().get()
+                    rejected += dropped
+                    yield from rows
+            while pending:
+                rows, dropped = pending.popleft().get()
+                rejected += dropped
+                yield from rows
+    else:
+        for chunk in chunked(iter_csv_records(csv_path), chunk_size):
+            rows, dropped = validate_records(chunk)
+            rejected += dropped
+            yield from rows
+    if rejected:
+        print(f"⚠️  Skipped {rejected:,} rows without an id or category_2")
+
+
+def create_sqlite_db(
+    csv_path: str,
+    db_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+    fts: bool = False,
+    compress: bool = False,
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    dict_kib: int = DEFAULT_DICT_KIB,
+):
     """Convert CSV to SQLite database with optimizations."""
+    rows = read_csv_rows(csv_path, chunk_size, workers)
+    write_sqlite_db(rows, db_path, chunk_size, fts, compress, compress_level, dict_kib)
+
+
+def write_sqlite_db(
+    rows: Iterable[WineRow],
+    db_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fts: bool = False,
+    compress: bool = False,
+    compress_level: int = DEFAULT_COMPRESS_LEVEL,
+    dict_kib: int = DEFAULT_DICT_KIB,
+):
+    """Write wine rows to a fresh SQLite database with optimizations, committing every ``chunk_size`` rows.
+
+    With ``fts``, also build the ``wine_fts`` full-text index over name and description. With
+    ``compress``, descriptions are stored as zstd frames (BLOBs) using a dictionary trained on
+    them, which is kept in the ``description_codec`` table.
+    """
+    if compress and zstandard is None:
+        raise RuntimeError("--compress needs the zstandard package")
 
     # Remove existing database if it exists
     db_file = Path(db_path)
@@ -19,9 +174,17 @@ def create_sqlite_db(csv_path: str, db_path: str):
         print(f"Removing existing database: {db_path}")
         db_file.unlink()
 
-    conn = sqlite3.connect(db_path)
+    # Autocommit mode: transactions are opened explicitly per chunk
+    conn = sqlite3.connect(db_path, isolation_level=None)
     cursor = conn.cursor()
 
+    # Bulk-load settings: the file is rebuilt from scratch on failure, so skip the journal and fsyncs
+    cursor.execute("PRAGMA journal_mode=OFF")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor.execute("PRAGMA temp_store=FILE")
+    cursor.execute(f"PRAGMA cache_size=-{BUILD_CACHE_KIB}")
+
     # Create table matching PostgreSQL schema
     cursor.execute("""
         CREATE TABLE wine_descriptions (
@@ -34,35 +197,81 @@ def create_sqlite_db(csv_path: str, db_path: str):
         )
     """)
 
-    # Create index on category_2 for faster filtering
+    # Stage rows in input order, then copy them clustered by category_2 with dense rowids
+    # (1..N) so the app can pick a random wine in a category with a single rowid lookup
     cursor.execute("""
-        CREATE INDEX idx_category_2 ON wine_descriptions(category_2)
+        CREATE TEMP TABLE wine_staging (
+            id TEXT,
+            name TEXT,
+            category_1 TEXT,
+            category_2 TEXT,
+            origin TEXT,
+            description TEXT
+        )
     """)
-
-    # Import CSV data
-    print(f"Reading CSV from: {csv_path}")
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = []
-        for row in reader:
-            rows.append(
-                (row["id"], row["name"], row["category_1"], row["category_2"], row["origin"], row["description"])
-            )
-
+    staged = 0
+    started = last_report = time.perf_counter()
+    for chunk in chunked(rows, chunk_size):
+        cursor.execute("BEGIN")
         cursor.executemany(
             """
-            INSERT INTO wine_descriptions
+            INSERT INTO wine_staging
             (id, name, category_1, category_2, origin, description)
             VALUES (?, ?, ?, ?, ?, ?)
         """,
-            rows,
+            chunk,
+        )
+        cursor.execute("COMMIT")
+        staged += len(chunk)
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_INTERVAL:
+            print(f"  Staged {staged:,} rows ({staged / (now - started):,.0f} rows/s)")
+            last_report = now
+    elapsed = time.perf_counter() - started
+    print(f"Staged {staged:,} rows in {elapsed:.1f}s ({staged / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    # Clustered copy, then indexes and statistics, all in one transaction after the bulk load
+    cursor.execute("BEGIN")
+    description = "description"
+    if compress:
+        decompressor = train_description_codec(conn, staged, compress_level, dict_kib)
+        description = "compress_description(description)"
+        raw_bytes = cursor.execute("SELECT SUM(LENGTH(CAST(description AS BLOB))) FROM wine_staging").fetchone()[0]
+    cursor.execute(f"""
+        INSERT INTO wine_descriptions
+        (rowid, id, name, category_1, category_2, origin, description)
+        SELECT ROW_NUMBER() OVER (ORDER BY category_2, id), id, name, category_1, category_2, origin, {description}
+        FROM wine_staging
+        ORDER BY category_2, id
+    """)
+    print(f"Inserted {cursor.rowcount} wine descriptions")
+    cursor.execute("DROP TABLE wine_staging")
+    if compress:
+        report_compression(cursor, raw_bytes or 0, decompressor)
+
+    # Create index on category_2 for faster filtering
+    cursor.execute("""
+        CREATE INDEX idx_category_2 ON wine_descriptions(category_2)
+    """)
+
+    # First rowid and row count of each category's contiguous block
+    cursor.execute("""
+        CREATE TABLE category_ranges (
+            category_2 TEXT PRIMARY KEY,
+            first_rowid INTEGER NOT NULL,
+            count INTEGER NOT NULL
         )
+    """)
+    cursor.execute("""
+        INSERT INTO category_ranges (category_2, first_rowid, count)
+        SELECT category_2, MIN(rowid), COUNT(*) FROM wine_descriptions GROUP BY category_2
+    """)
 
-        print(f"Inserted {len(rows)} wine descriptions")
+    if fts:
+        create_fts_index(cursor, compress)
 
     # Optimize database for read-only access
     cursor.execute("ANALYZE")
-    cursor.execute("PRAGMA journal_mode=WAL")
 
     # Get statistics before committing
     cursor.execute("SELECT COUNT(*) FROM wine_descriptions")
@@ -71,11 +280,13 @@ def create_sqlite_db(csv_path: str, db_path: str):
     cursor.execute("SELECT COUNT(DISTINCT category_2) FROM wine_descriptions")
     categories = cursor.fetchone()[0]
 
-    conn.commit()
+    cursor.execute("COMMIT")
     cursor.close()
 
     # VACUUM must be run outside a transaction with no active cursors
     conn.execute("VACUUM")
+    # Also outside a transaction, where SQLite would ignore it; after VACUUM so it does not go through the WAL
+    journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
 
     db_size = db_file.stat().st_size / (1024 * 1024)  # MB
 
@@ -84,19 +295,126 @@ def create_sqlite_db(csv_path: str, db_path: str):
     print(f"  Size: {db_size:.2f} MB")
     print(f"  Records: {count:,}")
     print(f"  Categories: {categories}")
+    print(f"  Journal mode: {journal_mode}")
 
     conn.close()
 
 
+def train_description_codec(
+    conn: sqlite3.Connection, staged: int, level: int, dict_kib: int
+) -> "zstandard.ZstdDecompressor":
+    """Train a zstd dictionary on staged descriptions, store it in ``description_codec`` and
+    register ``compress_description``/``decompress_description`` SQL functions on ``conn``.
+    """
+    started = time.perf_counter()
+    step = max(1, staged // DICT_TRAINING_SAMPLES)
+    samples = [
+        text.encode("utf-8")
+        for (text,) in conn.execute("SELECT description FROM wine_staging WHERE rowid % ? = 0", (step,))
+        if text
+    ]
+    dictionary = zstandard.train_dictionary(dict_kib * 1024, samples, level=level)
+    conn.execute("CREATE TABLE description_codec (codec TEXT NOT NULL, dictionary BLOB NOT NULL)")
+    conn.execute("INSERT INTO description_codec VALUES (?, ?)", (DESCRIPTION_CODEC, dictionary.as_bytes()))
+    print(
+        f"Trained {len(dictionary.as_bytes()) / 1024:.0f} KiB dictionary on {len(samples):,} descriptions "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+    # The dictionary is stored once, so frames skip its ID and checksums (SQLite pages are not checksummed either)
+    compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary, write_checksum=False, write_dict_id=False)
+    decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+    conn.create_function(
+        "compress_description", 1, lambda text: compressor.compress(text.encode("utf-8")), deterministic=True
+    )
+    conn.create_function(
+        "decompress_description", 1, lambda data: decompressor.decompress(data).decode("utf-8"), deterministic=True
+    )
+    return decompressor
+
+
+def report_compression(cursor: sqlite3.Cursor, raw_bytes: int, decompressor: "zstandard.ZstdDecompressor"):
+    """Print the compression ratio (dictionary included) and the cost of decoding one description."""
+    stored = cursor.execute("SELECT SUM(LENGTH(description)) FROM wine_descriptions").fetchone()[0] or 0
+    stored += cursor.execute("SELECT LENGTH(dictionary) FROM description_codec").fetchone()[0]
+    blobs = [
+        data
+        for (data,) in cursor.execute(
+            "SELECT description FROM wine_descriptions ORDER BY rowid LIMIT ?", (DECODE_BENCH_SAMPLES,)
+        )
+    ]
+    started = time.perf_counter()
+    for data in blobs:
+        decompressor.decompress(data).decode("utf-8")
+    decode_us = (time.perf_counter() - started) / max(len(blobs), 1) * 1e6
+    print(
+        f"Compressed descriptions {raw_bytes / 1024 / 1024:,.1f} MiB -> {stored / 1024 / 1024:,.1f} MiB "
+        f"({raw_bytes / max(stored, 1):.2f}x), decode {decode_us:.1f} µs/row"
+    )
+
+
+def create_fts_index(cursor: sqlite3.Cursor, compressed: bool = False):
+    """Build ``wine_fts``, an FTS5 index over name and description used by the app's /search.
+
+    It is an external-content table (the text is read back from ``wine_descriptions`` by rowid, not
+    stored twice) with prefix indexes for 2 and 3 character prefixes. ``rank`` is BM25 with name
+    matches weighted above description matches. With compressed descriptions it is contentless
+    instead (FTS5 cannot read the BLOBs), indexing text from ``decompress_description``.
+    """
+    started = time.perf_counter()
+    content = "''" if compressed else "'wine_descriptions', content_rowid='rowid'"
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE wine_fts USING fts5(
+            name,
+            description,
+            content={content},
+            prefix='2 3',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    if compressed:
+        cursor.execute("""
+            INSERT INTO wine_fts (rowid, name, description)
+            SELECT rowid, name, decompress_description(description) FROM wine_descriptions
+        """)
+    else:
+        cursor.execute("INSERT INTO wine_fts(wine_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO wine_fts(wine_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+    cursor.execute("INSERT INTO wine_fts(wine_fts) VALUES ('optimize')")
+    print(f"Built full-text index in {time.perf_counter() - started:.1f}s")
+
+
 if __name__ == "__main__":
     script_dir = Path(__file__).parent
     project_dir = script_dir.parent
 
-    csv_path = project_dir / "wine_data.csv"
-    db_path = project_dir / "wine_data.db"
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("csv_path", type=Path, nargs="?", default=project_dir / "wine_data.csv")
+    parser.add_argument("db_path", type=Path, nargs="?", default=project_dir / "wine_data.db")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per insert transaction")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="processes parsing and validating CSV shards (1 = inline)"
+    )
+    parser.add_argument("--fts", action="store_true", help="build the wine_fts full-text index used by /search")
+    parser.add_argument("--compress", action="store_true", help="store descriptions zstd-compressed (needs zstandard)")
+    parser.add_argument("--compress-level", type=int, default=DEFAULT_COMPRESS_LEVEL, help="zstd level for --compress")
+    parser.add_argument("--dict-size", type=int, default=DEFAULT_DICT_KIB, help="zstd dictionary size in KiB")
+    args = parser.parse_args()
+
+    if args.compress and zstandard is None:
+        parser.error("--compress needs the zstandard package (pip install zstandard)")
 
-    if not csv_path.exists():
-        print(f"❌ Error: CSV file not found at {csv_path}")
+    if not args.csv_path.exists():
+        print(f"❌ Error: CSV file not found at {args.csv_path}")
         sys.exit(1)
 
-    create_sqlite_db(str(csv_path), str(db_path))
+    create_sqlite_db(
+        str(args.csv_path),
+        str(args.db_path),
+        args.chunk_size,
+        args.workers,
+        args.fts,
+        args.compress,
+        args.compress_level,
+        args.dict_size,
+    )
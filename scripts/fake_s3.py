@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Minimal local stand-in for MinIO, serving buckets from a directory (<root>/<bucket>/<key>).
+Implements just what app.py and the scripts use: list buckets, bucket location/HEAD, ListObjectsV2,
+HEAD/GET (with Range), PUT and multipart uploads of objects. Requests are not authenticated.
+"""
+
+import argparse
+import hashlib
+import re
+import threading
+import time
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+S3_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeS3Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _split(self) -> tuple[str, str, dict[str, list[str]]]:
+        url = urlsplit(self.path)
+        bucket, _, key = unquote(url.path).lstrip("/").partition("/")
+        return bucket, key, parse_qs(url.query, keep_blank_values=True)
+
+    def _send(self, status: int, body: bytes = b"", headers: dict[str, str] | None = None, head: bool = False):
+        headers = headers or {}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if "Content-Length" not in headers:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head and body:
+            self.wfile.write(body)
+
+    def _send_xml(self, xml: str, status: int = 200):
+        self._send(status, xml.encode("utf-8"), {"Content-Type": "application/xml"})
+
+    def _send_error(self, status: int, code: str, head: bool = False):
+        if head:
+            self._send(status, head=True)
+            return
+        self._send_xml(f"<Error><Code>{code}</Code><Message>{code}</Message></Error>", status)
+
+    def _object_headers(self, path: Path) -> dict[str, str]:
+        stat = path.stat()
+        return {
+            "ETag": f'"{self.server.etag(path)}"',
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+            "Content-Type": "application/octet-stream",
+            "Accept-Ranges": "bytes",
+        }
+
+    def do_HEAD(self):
+        self._get_or_head(head=True)
+
+    def do_GET(self):
+        self._get_or_head(head=False)
+
+    def _get_or_head(self, head: bool):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        bucket, key, query = self._split()
+        if not bucket:
+            buckets = "".join(
+                f"<Bucket><Name>{escape(p.name)}</Name><CreationDate>2024-01-01T00:00:00.000Z</CreationDate></Bucket>"
+                for p in sorted(self.server.root.iterdir())
+                if p.is_dir()
+            )
+            self._send_xml(
+                f'<ListAllMyBucketsResult xmlns="{S3_NS}"><Buckets>{buckets}</Buckets></ListAllMyBucketsResult>'
+            )
+            return
+
+        bucket_dir = self.server.root / bucket
+        if not bucket_dir.is_dir():
+            self._send_error(404, "NoSuchBucket", head)
+            return
+        if not key:
+            if "location" in query:
+                self._send_xml(f'<LocationConstraint xmlns="{S3_NS}"></LocationConstraint>')
+            elif head:
+                self._send(200, head=True)
+            else:
+                self._list_objects(bucket_dir, bucket, query.get("prefix", [""])[0])
+            return
+
+        path = bucket_dir / key
+        if not path.is_file():
+            self._send_error(404, "NoSuchKey", head)
+            return
+        headers = self._object_headers(path)
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header and range_header.startswith("bytes="):
+            first, _, last = range_header[6:].partition("-")
+            start, end = int(first), min(int(last) if last else size - 1, size - 1)
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        if head:
+            self._send(status, headers=headers, head=True)
+            return
+        with open(path, "rb") as f:
+            f.seek(start)
+            body = f.read(end - start + 1)
+        self._send(status, body, headers)
+
+    def _list_objects(self, bucket_dir: Path, bucket: str, prefix: str):
+        contents = []
+        for path in sorted(p for p in bucket_dir.rglob("*") if p.is_file()):
+            key = path.relative_to(bucket_dir).as_posix()
+            if key.startswith(prefix):
+                contents.append(
+                    f"<Contents><Key>{escape(key)}</Key><LastModified>2024-01-01T00:00:00.000Z</LastModified>"
+                    f'<ETag>"{self.server.etag(path)}"</ETag><Size>{path.stat().st_size}</Size>'
+                    "<StorageClass>STANDARD</StorageClass></Contents>"
+                )
+        self._send_xml(
+            f'<ListBucketResult xmlns="{S3_NS}"><Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>'
+            f"<KeyCount>{len(contents)}</KeyCount><MaxKeys>1000</MaxKeys><IsTruncated>false</IsTruncated>"
+            f"{''.join(contents)}</ListBucketResult>"
+        )
+
+    def do_PUT(self):
+        bucket, key, query = self._split()
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        path = self.server.root / bucket / key if key else self.server.root / bucket
+        if not key:
+            path.mkdir(parents=True, exist_ok=True)
+            self._send(200)
+            return
+        if "uploadId" in query:
+            parts = self.server.uploads.get(query["uploadId"][0])
+            if parts is None:
+                self._send_error(404, "NoSuchUpload")
+                return
+            parts[int(query["partNumber"][0])] = body
+            self._send(200, headers={"ETag": f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'})
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        self._send(200, headers={"ETag": f'"{self.server.etag(path)}"'})
+
+    def do_POST(self):
+        bucket, key, query = self._split()
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            self.server.uploads[upload_id] = {}
+            self._send_xml(
+                f'<InitiateMultipartUploadResult xmlns="{S3_NS}"><Bucket>{escape(bucket)}</Bucket>'
+                f"<Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>"
+            )
+            return
+        if "uploadId" not in query:
+            self._send_error(400, "InvalidRequest")
+            return
+        parts = self.server.uploads.pop(query["uploadId"][0], None)
+        if parts is None:
+            self._send_error(404, "NoSuchUpload")
+            return
+        numbers = [int(n) for n in re.findall(r"<PartNumber>(\d+)</PartNumber>", body.decode("utf-8"))]
+        path = self.server.root / bucket / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"".join(parts[n] for n in numbers))
+        etag = self.server.set_multipart_etag(path, [parts[n] for n in numbers])
+        self._send_xml(
+            f'<CompleteMultipartUploadResult xmlns="{S3_NS}"><Bucket>{escape(bucket)}</Bucket>'
+            f'<Key>{escape(key)}</Key><ETag>"{etag}"</ETag></CompleteMultipartUploadResult>'
+        )
+
+
+class FakeS3Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, root: Path, port: int = 0, delay: float = 0.0):
+        super().__init__(("127.0.0.1", port), FakeS3Handler)
+        self.root = root
+        self.delay = delay
+        self._etags: dict[tuple[Path, float, int], str] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}  # upload id -> part number -> data
+
+    @property
+    def endpoint(self) -> str:
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def etag(self, path: Path) -> str:
+        """Content MD5, like a single-part S3 upload; cached per (path, mtime, size)."""
+        stat = path.stat()
+        cache_key = (path, stat.st_mtime, stat.st_size)
+        if cache_key not in self._etags:
+            md5 = hashlib.md5(usedforsecurity=False)
+            with open(path, "rb") as f:
+                while block := f.read(1024 * 1024):
+                    md5.update(block)
+            self._etags[cache_key] = md5.hexdigest()
+        return self._etags[cache_key]
+
+    def set_multipart_etag(self, path: Path, parts: list[bytes]) -> str:
+        """Record the S3 multipart ETag (MD5 of the part MD5s, then -<part count>) for ``path``."""
+        digests = b"".join(hashlib.md5(part, usedforsecurity=False).digest() for part in parts)
+        etag = f"{hashlib.md5(digests, usedforsecurity=False).hexdigest()}-{len(parts)}"
+        stat = path.stat()
+        self._etags[(path, stat.st_mtime, stat.st_size)] = etag
+        return etag
+
+    def start_in_thread(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="fake-s3", daemon=True)
+        thread.start()
+        return thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("root", type=Path, help="directory containing one subdirectory per bucket")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to sleep before each GET/HEAD")
+    args = parser.parse_args()
+
+    server = FakeS3Server(args.root, args.port, args.delay)
+    print(f"Serving {args.root} at http://{server.endpoint}")
+    server.serve_forever()
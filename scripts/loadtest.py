@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Offline load test: runs the app under uvicorn against scripts/fake_s3.py and a synthetic wine_data.db,
+drives /, /wine, the SEO pages and /health at a fixed concurrency, and reports throughput, latency and RSS.
+Results can be saved as a baseline and later runs compared against it (exit 1 on regression).
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from fake_s3 import FakeS3Server
+from synthetic_db import build_synthetic_db
+
+project_dir = Path(__file__).parent.parent
+
+# Must match SEO_PAGES in app.py
+SEO_PATHS = [
+    "/ai-wine-generator",
+    "/fake-wine-name-generator",
+    "/ai-wine-label-generator",
+    "/wine-tasting-note-generator",
+    "/about",
+]
+# (path, weight): mostly random wine pages, like production traffic
+ROUTES = [("/", 4), ("/wine", 4), *[(path, 1) for path in SEO_PATHS], ("/health", 1)]
+LABELS_PER_CATEGORY = 20
+CATEGORY_COUNT = 15
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def populate_store(root: Path, db_path: Path):
+    """Lay out the buckets the app expects: the database and placeholder labels for every category."""
+    data_bucket = root / "wine-data"
+    data_bucket.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(db_path, data_bucket / "wine_data.db")
+    labels_bucket = root / "wine-bottles"
+    labels_bucket.mkdir(exist_ok=True)
+    label = (project_dir / "static" / "wine_logo_2.jpeg").read_bytes()
+    for category in range(1, CATEGORY_COUNT + 1):
+        for i in range(LABELS_PER_CATEGORY):
+            (labels_bucket / f"cat_{category}_{i}.png").write_bytes(label)
+
+
+def read_rss(pid: int) -> dict[str, int]:
+    """VmRSS/VmHWM of a process in KB (Linux only; empty elsewhere)."""
+    rss = {}
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            name, _, value = line.partition(":")
+            if name in ("VmRSS", "VmHWM"):
+                rss[name] = int(value.split()[0])
+    except OSError:
+        pass
+    return rss
+
+
+def wait_until_live(port: int, server: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"app exited during startup with code {server.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health/ready")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"app not ready after {timeout:.0f}s")
+
+
+def drive(port: int, concurrency: int, duration: float) -> dict:
+    """Run ``concurrency`` keep-alive clients for ``duration`` seconds; return per-route and overall stats."""
+    schedule = [path for path, weight in ROUTES for _ in range(weight)]
+    latencies: dict[str, list[float]] = {path: [] for path, _ in ROUTES}
+    errors: dict[str, int] = {path: 0 for path, _ in ROUTES}
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def worker(offset: int):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        local_latencies: dict[str, list[float]] = {path: [] for path, _ in ROUTES}
+        local_errors: dict[str, int] = {path: 0 for path, _ in ROUTES}
+        i = offset
+        while time.monotonic() < stop_at:
+            path = schedule[i % len(schedule)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                ok = False
+            if ok:
+                local_latencies[path].append(time.perf_counter() - start)
+            else:
+                local_errors[path] += 1
+        conn.close()
+        with lock:
+            for path in latencies:
+                latencies[path].extend(local_latencies[path])
+                errors[path] += local_errors[path]
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    def summarize(values: list[float], error_count: int) -> dict:
+        values = sorted(values)
+        return {
+            "requests": len(values),
+            "errors": error_count,
+            "rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+        }
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "overall": summarize(all_latencies, sum(errors.values())),
+        "routes": {path: summarize(latencies[path], errors[path]) for path in latencies},
+    }
+
+
+def print_report(results: dict):
+    print(f"\n{'route':<32} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for path, stats in [*results["routes"].items(), ("overall", results["overall"])]:
+        print(f"{path:<32} {stats['rps']:>9.1f} {stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>7}")
+    rss = results["rss_kb"]
+    if rss:
+        print(f"\nRSS: {rss.get('VmRSS', 0) / 1024:.1f} MB (peak {rss.get('VmHWM', 0) / 1024:.1f} MB)")
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Return a description of every metric that is worse than the baseline by more than ``max_regression``."""
+    failures = []
+    current, previous = results["overall"], baseline["overall"]
+    if current["rps"] < previous["rps"] * (1 - max_regression):
+        failures.append(f"throughput {current['rps']:.1f} req/s vs baseline {previous['rps']:.1f}")
+    for metric in ("p50_ms", "p99_ms"):
+        if current[metric] > previous[metric] * (1 + max_regression):
+            failures.append(f"{metric} {current[metric]:.2f} vs baseline {previous[metric]:.2f}")
+    peak, previous_peak = results["rss_kb"].get("VmHWM"), baseline.get("rss_kb", {}).get("VmHWM")
+    if peak and previous_peak and peak > previous_peak * (1 + max_regression):
+        failures.append(f"peak RSS {peak / 1024:.1f} MB vs baseline {previous_peak / 1024:.1f} MB")
+    if current["errors"] > previous["errors"]:
+        failures.append(f"{current['errors']} errors vs baseline {previous['errors']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000, help="synthetic database size (10k to 5M)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load after a short warm-up")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workdir", type=Path, default=Path(tempfile.gettempdir()) / "wine_loadtest")
+    parser.add_argument("--save-baseline", type=Path, help="write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare against a saved baseline")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="allowed relative regression (0.15 = 15%%)")
+    parser.add_argument("--verbose", action="store_true", help="show the app's log output")
+    args = parser.parse_args()
+
+    if not 10_000 <= args.rows <= 5_000_000:
+        parser.error("--rows must be between 10,000 and 5,000,000")
+
+    args.workdir.mkdir(parents=True, exist_ok=True)
+    db_path = build_synthetic_db(args.workdir / f"synthetic_{args.rows}.db", args.rows)
+
+    run_dir = Path(tempfile.mkdtemp(prefix="run_", dir=args.workdir))
+    store_root, data_dir = run_dir / "s3", run_dir / "data"
+    data_dir.mkdir()
+    populate_store(store_root, db_path)
+    store = FakeS3Server(store_root)
+    store.start_in_thread()
+
+    env = {
+        **os.environ,
+        "MINIO_ENDPOINT": store.endpoint,
+        "MINIO_ACCESS_KEY": "loadtest",
+        "MINIO_SECRET_KEY": "loadtest",
+        "MINIO_SECURE": "false",
+        "DATA_DIR": str(data_dir),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=project_dir,
+        env=env,
+        stdout=None if args.verbose else subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    try:
+        started = time.perf_counter()
+        wait_until_live(args.port, server, timeout=120)
+        print(f"App ready in {time.perf_counter() - started:.1f}s ({args.rows:,} rows, {store.endpoint})")
+
+        drive(args.port, args.concurrency, args.warmup)
+        print(f"Driving {args.concurrency} clients for {args.duration:.0f}s...")
+        results = drive(args.port, args.concurrency, args.duration)
+        results["rss_kb"] = read_rss(server.pid)
+        results["config"] = {"rows": args.rows, "concurrency": args.concurrency, "duration": args.duration}
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        store.shutdown()
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    print_report(results)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nSaved baseline: {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("config") != results["config"]:
+            print(f"\n⚠️  Baseline config {baseline.get('config')} differs from this run")
+        failures = compare(results, baseline, args.max_regression)
+        if failures:
+            print(f"\n❌ Regression beyond {args.max_regression:.0%}:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"\n✅ Within {args.max_regression:.0%} of baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Sync a directory of bottle labels to the wine-bottles bucket, uploading only new or changed files.
+Local files are compared with the remote listing by size and then by ETag (MD5, or the multipart
+MD5-of-MD5s), hashing and uploading on a thread pool. The label manifest is rebuilt afterwards.
+"""
+
+import argparse
+import hashlib
+import math
+import mimetypes
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from pathlib import Path
+
+import certifi
+import urllib3
+from build_label_manifest import CATEGORY_COUNT
+from build_label_manifest import LABELS_BUCKET
+from build_label_manifest import build_manifest
+from build_label_manifest import label_category
+from build_label_manifest import make_minio_client
+from build_label_manifest import manifest_labels
+from build_label_manifest import upload_manifest
+from minio import Minio
+
+MIB = 1024 * 1024
+DEFAULT_PART_SIZE = 16 * MIB  # files larger than this are uploaded in parts
+MIN_PART_SIZE = 5 * MIB  # S3 minimum
+PROGRESS_INTERVAL = 2.0  # seconds between progress lines
+
+
+def multipart_etag(path: Path, part_size: int) -> str:
+    """S3 multipart ETag: the MD5 of the parts' MD5 digests, then -<part count>."""
+    digests = []
+    with open(path, "rb") as f:
+        while part := f.read(part_size):
+            digests.append(hashlib.md5(part, usedforsecurity=False).digest())
+    return f"{hashlib.md5(b''.join(digests), usedforsecurity=False).hexdigest()}-{len(digests)}"
+
+
+def matches_remote_etag(path: Path, size: int, remote_etag: str, part_size: int) -> bool:
+    """Whether ``path`` has the content of an object with ``remote_etag`` (single-part or multipart)."""
+    _, _, parts = remote_etag.partition("-")
+    if not parts:
+        md5 = hashlib.md5(usedforsecurity=False)
+        with open(path, "rb") as f:
+            while block := f.read(MIB):
+                md5.update(block)
+        return md5.hexdigest() == remote_etag
+    # The part size is not recorded: try ours, common client defaults and the smallest whole-MiB
+    # size giving the same part count, skipping any that would give a different count
+    candidates = dict.fromkeys([part_size, MIN_PART_SIZE, 8 * MIB, 16 * MIB, math.ceil(size / int(parts) / MIB) * MIB])
+    return any(
+        multipart_etag(path, candidate) == remote_etag
+        for candidate in candidates
+        if math.ceil(size / candidate) == int(parts)
+    )
+
+
+def sync_label(
+    client: Minio, path: Path, remote: tuple[int, str] | None, part_size: int, dry_run: bool
+) -> tuple[str, int]:
+    """Upload ``path`` unless the remote object already matches; returns (status, bytes uploaded)."""
+    size = path.stat().st_size
+    if remote is None:
+        status = "new"
+    elif remote[0] != size or not matches_remote_etag(path, size, remote[1], part_size):
+        status = "changed"
+    else:
+        return "unchanged", 0
+    if not dry_run:
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        client.fput_object(LABELS_BUCKET, path.name, str(path), content_type=content_type, part_size=part_size)
+    return status, size
+
+
+def make_client(workers: int) -> Minio:
+    # One pooled connection per worker (the default pool keeps 10 and discards the rest)
+    http_client = urllib3.PoolManager(
+        maxsize=workers,
+        timeout=urllib3.Timeout(connect=10, read=300),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+    )
+    return make_minio_client(http_client=http_client)
+
+
+def local_labels(label_dir: Path) -> list[Path]:
+    """Label files in ``label_dir``; exits if any is not named so the app can place it."""
+    files = sorted(p for p in label_dir.iterdir() if p.is_file() and not p.name.startswith("."))
+    invalid = [p.name for p in files if label_category(p.name) is None]
+    if invalid:
+        print(f"❌ Error: {len(invalid):,} files are not named cat_<1-{CATEGORY_COUNT}>_<name>, e.g.:")
+        for name in invalid[:10]:
+            print(f"  {name}")
+        sys.exit(1)
+    return files
+
+
+def list_remote_labels(client: Minio, dry_run: bool) -> dict[str, tuple[int, str]]:
+    """Size and ETag of every object in the labels bucket, creating the bucket if needed."""
+    if not client.bucket_exists(LABELS_BUCKET):
+        print(f"Creating bucket: {LABELS_BUCKET}")
+        if not dry_run:
+            client.make_bucket(LABELS_BUCKET)
+        return {}
+    print(f"Listing {LABELS_BUCKET}...")
+    return {
+        obj.object_name: (obj.size, (obj.etag or "").strip('"'))
+        for obj in client.list_objects(LABELS_BUCKET, recursive=True)
+    }
+
+
+def sync_labels(
+    client: Minio, files: list[Path], remote: dict[str, tuple[int, str]], args: argparse.Namespace
+) -> tuple[dict[str, int], int, list[str]]:
+    """Sync ``files`` on a thread pool; returns counts per status, bytes uploaded and failures."""
+    part_size = args.part_size * MIB
+    counts = {"new": 0, "changed": 0, "unchanged": 0}
+    uploaded = 0
+    failures = []
+    started = last_report = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(sync_label, client, path, remote.get(path.name), part_size, args.dry_run): path
+            for path in files
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                status, size = future.result()
+            except Exception as e:
+                failures.append(f"{futures[future].name}: {e}")
+                continue
+            counts[status] += 1
+            uploaded += size
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL:
+                elapsed = now - started
+                print(f"  {done:,}/{len(files):,} checked, {uploaded / MIB / elapsed:,.1f} MiB/s uploaded")
+                last_report = now
+    return counts, uploaded, failures
+
+
+def rebuild_manifest(client: Minio, files: list[Path], remote: dict[str, tuple[int, str]]) -> None:
+    labels = manifest_labels(set(remote) | {path.name for path in files})
+    data = build_manifest(labels)
+    etag = upload_manifest(client, data)
+    print(f"\n✅ Manifest rebuilt: {len(labels):,} labels, ETag {etag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("label_dir", type=Path, help="directory of cat_<n>_<name> label files")
+    parser.add_argument("--workers", type=int, default=32, help="concurrent hashes and uploads")
+    parser.add_argument("--part-size", type=int, default=DEFAULT_PART_SIZE // MIB, help="multipart part size in MiB")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be uploaded")
+    parser.add_argument("--no-manifest", action="store_true", help="do not rebuild the label manifest")
+    args = parser.parse_args()
+
+    if args.part_size * MIB < MIN_PART_SIZE:
+        parser.error(f"--part-size must be at least {MIN_PART_SIZE // MIB} MiB")
+    if not args.label_dir.is_dir():
+        print(f"❌ Error: {args.label_dir} is not a directory")
+        sys.exit(1)
+
+    files = local_labels(args.label_dir)
+    client = make_client(args.workers)
+    remote = list_remote_labels(client, args.dry_run)
+    print(f"{len(files):,} local labels, {len(remote):,} remote objects")
+
+    started = time.perf_counter()
+    counts, uploaded, failures = sync_labels(client, files, remote, args)
+    elapsed = time.perf_counter() - started
+
+    verb = "Would upload" if args.dry_run else "Uploaded"
+    print(f"\n{verb} {counts['new']:,} new and {counts['changed']:,} changed labels, {counts['unchanged']:,} unchanged")
+    print(
+        f"  {uploaded / MIB:,.1f} MiB in {elapsed:.1f}s "
+        f"({len(files) / max(elapsed, 1e-9):,.0f} files/s, {uploaded / MIB / max(elapsed, 1e-9):,.1f} MiB/s)"
+    )
+    if failures:
+        print(f"\n❌ {len(failures):,} uploads failed, e.g.:")
+        for failure in failures[:10]:
+            print(f"  {failure}")
+        sys.exit(1)
+
+    if not (args.dry_run or args.no_manifest) and (counts["new"] or counts["changed"]):
+        rebuild_manifest(client, files, remote)
+
+
+if __name__ == "__main__":
+    main()
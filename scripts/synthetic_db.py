@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic wine_data.db for benchmarks.
+Rows follow the real schema and category names, with deterministic fake text.
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+from collections.abc import Iterator
+from contextlib import closing
+from pathlib import Path
+
+from csv_to_sqlite import WineRow
+from csv_to_sqlite import write_sqlite_db
+
+# Must match WineCategory.display_name in app.py
+CATEGORIES = [
+    "Bordeaux Red Blends",
+    "Cabernet Sauvignon",
+    "Chardonnay",
+    "Merlot",
+    "Other Red Blends",
+    "Other White Blends",
+    "Pinot Gris/Grigio",
+    "Pinot Noir",
+    "Rhone Red Blends",
+    "Riesling",
+    "Rosé",
+    "Sangiovese",
+    "Sauvignon Blanc",
+    "Syrah/Shiraz",
+    "Zinfandel",
+]
+ORIGINS = ["Napa Valley, California", "Bordeaux, France", "Mendoza, Argentina", "Barossa Valley, Australia"]
+WORDS = (
+    "bright cherry plum oak vanilla tannin finish palate nose aromas of black currant earthy mineral "
+    "crisp acidity silky structure lingering spice leather tobacco citrus peach floral notes with hints of"
+).split()
+
+
+def generate_rows(count: int, seed: int = 0) -> Iterator[WineRow]:
+    """Yield ``count`` deterministic fake wine rows spread across all categories."""
+    rng = random.Random(seed)
+    for i in range(count):
+        category_2 = CATEGORIES[rng.randrange(len(CATEGORIES))]
+        name = f"Chateau {rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {1990 + rng.randrange(35)}"
+        description = " ".join(rng.choices(WORDS, k=60)).capitalize() + "."
+        yield (f"syn-{i}", name, "Wine", category_2, rng.choice(ORIGINS), description)
+
+
+def row_count(db_path: Path) -> int | None:
+    """Rows in ``db_path``'s wine_descriptions, or None when it is missing or not a wine database."""
+    if not db_path.exists():
+        return None
+    try:
+        with closing(sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)) as conn:
+            return conn.execute("SELECT COUNT(*) FROM wine_descriptions").fetchone()[0]
+    except sqlite3.Error:
+        return None
+
+
+def build_synthetic_db(db_path: Path, count: int, seed: int = 0, fts: bool = False) -> Path:
+    """Build a synthetic database at ``db_path`` unless one with ``count`` rows already exists."""
+    existing = row_count(db_path)
+    if existing == count:
+        print(f"Reusing synthetic database: {db_path}")
+        return db_path
+    if existing is not None:
+        print(f"Rebuilding {db_path}: it has {existing:,} rows, not {count:,}")
+    write_sqlite_db(generate_rows(count, seed), str(db_path), fts=fts)
+    return db_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("db_path", type=Path)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fts", action="store_true", help="build the wine_fts full-text index")
+    args = parser.parse_args()
+
+    if args.db_path.exists():
+        print(f"❌ Error: {args.db_path} already exists")
+        sys.exit(1)
+    build_synthetic_db(args.db_path, args.rows, args.seed, args.fts)
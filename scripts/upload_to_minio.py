@@ -3,6 +3,7 @@
 Upload wine_data.db to MinIO.
 """
 
+import hashlib
 import os
 import sys
 from pathlib import Path
@@ -42,9 +43,20 @@ def upload_database():
         print(f"Creating bucket: {bucket_name}")
         client.make_bucket(bucket_name)
 
-    # Upload database
+    # Upload database with its SHA-256 so the app can verify downloads
+    sha256 = hashlib.sha256()
+    with open(db_file, "rb") as f:
+        while block := f.read(1024 * 1024):
+            sha256.update(block)
+
     print(f"Uploading {db_file.name} to MinIO...")
-    client.fput_object(bucket_name, "wine_data.db", str(db_file), content_type="application/x-sqlite3")
+    client.fput_object(
+        bucket_name,
+        "wine_data.db",
+        str(db_file),
+        content_type="application/x-sqlite3",
+        metadata={"sha256": sha256.hexdigest()},
+    )
 
     # Verify upload
     stat = client.stat_object(bucket_name, "wine_data.db")
@@ -54,6 +66,8 @@ def upload_database():
     print(f"  Bucket: {bucket_name}")
     print("  Object: wine_data.db")
     print(f"  Size: {size_mb:.2f} MB")
+    print(f"  ETag: {stat.etag}")
+    print(f"  SHA-256: {sha256.hexdigest()}")
     print(f"  Endpoint: {endpoint}")
 
 
@@ -0,0 +1,24 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+# app.py reads its settings at import time and serves templates/ and static/ relative to the working directory
+os.environ.setdefault("MINIO_ENDPOINT", "localhost:9000")
+os.environ.setdefault("MINIO_ACCESS_KEY", "test")
+os.environ.setdefault("MINIO_SECRET_KEY", "test")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="wine_tests_"))
+os.chdir(PROJECT_DIR)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    import app
+
+    # Not entered as a context manager, so the startup events (MinIO downloads) never run
+    return TestClient(app.app)
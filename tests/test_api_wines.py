@@ -0,0 +1,77 @@
+import json
+import threading
+
+import pytest
+from csv_to_sqlite import write_sqlite_db
+from synthetic_db import generate_rows
+
+import app
+
+LABELS = [(category.value, f"cat_{category.value}_0.png") for category in app.WineCategory]
+
+
+@pytest.fixture(scope="module")
+def wine_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("api") / "wine_data.db"
+    write_sqlite_db(generate_rows(300), str(path))
+    return path
+
+
+@pytest.fixture
+def started(wine_db, monkeypatch):
+    event = threading.Event()
+    event.set()
+    monkeypatch.setattr(app, "STARTUP_COMPLETE", event)
+    monkeypatch.setattr(app, "DB_PATH", wine_db)
+    monkeypatch.setattr(app, "DB_POOL", None)
+    monkeypatch.setattr(app, "WINE_CATALOG", None)
+    monkeypatch.setattr(app, "BOTTLE_LIST", LABELS)
+    yield
+    if app.DB_POOL is not None:
+        app.DB_POOL.close()
+
+
+def check_wines(wines: list[dict], n: int) -> None:
+    assert len(wines) == n
+    for wine in wines:
+        assert wine["category_2"] == app.WineCategory(wine["label_category"]).display_name
+        assert wine["image"] == f"{app.IMAGE_DIR}cat_{wine['label_category']}_0.png"
+
+
+def test_returns_n_wines_with_labels_of_their_category(client, started):
+    response = client.get("/api/wines", params={"n": 25})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    check_wines(response.json(), 25)
+
+
+def test_large_responses_are_streamed_as_one_array(client, started):
+    n = 2 * app.API_STREAM_CHUNK + 7
+    response = client.get("/api/wines", params={"n": n})
+    assert response.status_code == 200
+    assert "content-length" not in response.headers
+    check_wines(json.loads(response.content), n)
+
+
+def test_category_filter(client, started):
+    wines = client.get("/api/wines", params={"n": 10, "category": 3}).json()
+    assert {wine["label_category"] for wine in wines} == {3}
+
+
+def test_category_without_labels_is_404(client, started, monkeypatch):
+    monkeypatch.setattr(app, "BOTTLE_LIST", LABELS[:1])
+    assert client.get("/api/wines", params={"category": 2}).status_code == 404
+
+
+@pytest.mark.parametrize(
+    "params", [{"n": 0}, {"n": app.MAX_API_WINES + 1}, {"category": 0}, {"category": len(app.WineCategory) + 1}]
+)
+def test_out_of_range_parameters_are_422(client, started, params):
+    assert client.get("/api/wines", params=params).status_code == 422
+
+
+def test_503_with_retry_after_while_loading(client):
+    assert not app.STARTUP_COMPLETE.is_set()
+    response = client.get("/api/wines")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
@@ -0,0 +1,33 @@
+import csv
+import sqlite3
+
+import pytest
+from csv_to_sqlite import create_sqlite_db
+from csv_to_sqlite import validate_records
+
+
+def test_validate_records_strips_only_key_fields():
+    rows, rejected = validate_records(
+        [
+            [" a1 ", " Name ", "Wine", " Merlot ", " Napa ", "  Two  spaces.\n"],
+            ["  ", "No id", "Wine", "Merlot", "Napa", "Dropped."],
+            ["a2", "No category", "Wine", " ", "Napa", "Dropped."],
+        ]
+    )
+    assert rows == [("a1", " Name ", "Wine", "Merlot", " Napa ", "  Two  spaces.\n")]
+    assert rejected == 2
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_built_database_uses_wal(tmp_path, workers):
+    csv_path = tmp_path / "wine_data.csv"
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "category_1", "category_2", "origin", "description"])
+        writer.writerow(["a1", "Name", "Wine", "Merlot", "Napa", "Keeps  its\nspacing "])
+    db_path = tmp_path / "wine_data.db"
+    create_sqlite_db(str(csv_path), str(db_path), workers=workers)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT description FROM wine_descriptions").fetchone()[0] == "Keeps  its\nspacing "
+    conn.close()
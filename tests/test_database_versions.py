@@ -0,0 +1,145 @@
+import collections
+import fcntl
+import sqlite3
+from contextlib import closing
+from types import SimpleNamespace
+
+import pytest
+from csv_to_sqlite import write_sqlite_db
+from synthetic_db import generate_rows
+
+import app
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(app, "DB_PATH", tmp_path / "wine_data.db")
+    return tmp_path
+
+
+def lock_is_free(name: str) -> bool:
+    with open(app.DATA_DIR / f"{name}.lock", "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return True
+
+
+def write_database(path):
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("CREATE TABLE wine_descriptions (id TEXT)")
+        conn.commit()
+
+
+class FakeMinio:
+    def __init__(self, etag, on_stat=None):
+        self.etag = etag
+        self.on_stat = on_stat
+        self.stat_lock_free = None
+        self.downloads = 0
+
+    def stat_object(self, bucket, object_name):
+        self.stat_lock_free = lock_is_free(app.DATABASE_LOCK)
+        if self.on_stat:
+            self.on_stat()
+        return SimpleNamespace(etag=self.etag, size=1, metadata={})
+
+    def get_object(self, *args, **kwargs):
+        self.downloads += 1
+        raise AssertionError("unexpected download")
+
+
+def test_current_version_is_checked_without_the_lock(data_dir):
+    write_database(app.database_version_path("v1"))
+    app.publish_database_version(app.database_version_path("v1"))
+    client = FakeMinio("v1")
+    assert app.fetch_database_version(client) is None
+    assert client.stat_lock_free
+
+
+def test_version_published_while_waiting_is_not_downloaded_again(data_dir):
+    def other_worker_publishes():
+        write_database(app.database_version_path("v2"))
+        app.publish_database_version(app.database_version_path("v2"))
+
+    client = FakeMinio("v2", on_stat=other_worker_publishes)
+    assert app.fetch_database_version(client) is None
+    assert client.downloads == 0
+    assert app.current_database_etag() == "v2"
+
+
+def test_downloaded_version_is_published(data_dir, monkeypatch):
+    def download(client, bucket, object_name, size, dest):
+        assert not lock_is_free(app.DATABASE_LOCK)
+        write_database(dest)
+
+    monkeypatch.setattr(app, "download_object_ranged", download)
+    assert app.fetch_database_version(FakeMinio("v3")) == app.database_version_path("v3")
+    assert app.DB_PATH.resolve() == app.database_version_path("v3")
+    assert lock_is_free(app.DATABASE_LOCK)
+
+
+def is_closed(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def publish_wines(etag: str, rows: int):
+    path = app.database_version_path(etag)
+    write_sqlite_db(generate_rows(rows), str(path))
+    app.publish_database_version(path)
+    return path
+
+
+def wine_count(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COUNT(*) FROM wine_descriptions").fetchone()[0]
+
+
+@pytest.fixture
+def swappable(data_dir, monkeypatch):
+    monkeypatch.setattr(app, "DB_POOL", None)
+    monkeypatch.setattr(app, "SEARCH_POOL", None)
+    monkeypatch.setattr(app, "WINE_CATALOG", None)
+    monkeypatch.setattr(app, "RETIRED_DB_POOL_STATS", collections.Counter())
+    yield
+    if app.DB_POOL is not None:
+        app.DB_POOL.close()
+
+
+def test_publish_flips_the_symlink(swappable):
+    v1 = publish_wines("v1", 10)
+    assert app.DB_PATH.is_symlink()
+    assert app.DB_PATH.readlink().name == v1.name
+    v2 = publish_wines("v2", 10)
+    assert app.DB_PATH.readlink().name == v2.name
+    assert app.current_database_etag() == "v2"
+    assert not list(app.DB_PATH.parent.glob("*.link"))
+
+
+def test_swap_drains_old_connections(swappable):
+    stale = publish_wines("v0", 5)
+    app.swap_database(publish_wines("v1", 10).resolve())
+    old_pool = app.get_db_pool()
+
+    with old_pool.connection() as old_conn:
+        v2 = publish_wines("v2", 20)
+        app.swap_database(app.DB_PATH.resolve())
+        assert app.get_db_pool().db_path == v2
+        # A request already holding a connection finishes on the old version
+        assert wine_count(old_conn) == 10
+        assert not is_closed(old_conn)
+    assert is_closed(old_conn)
+    assert old_pool.stats()["size"] == 0
+
+    with app.get_db_pool().connection() as conn:
+        assert wine_count(conn) == 20
+    assert app.RETIRED_DB_POOL_STATS["checkouts"] == 2
+    # The previous version is kept for other workers; older ones are removed
+    assert old_pool.db_path.exists()
+    assert not stale.exists()
@@ -0,0 +1,42 @@
+import pytest
+from csv_to_sqlite import write_sqlite_db
+from synthetic_db import generate_rows
+
+import app
+
+
+@pytest.fixture(scope="module")
+def databases(tmp_path_factory):
+    rows = list(generate_rows(2_000))
+    paths = {}
+    for compress in (False, True):
+        path = tmp_path_factory.mktemp("codec") / "wine_data.db"
+        write_sqlite_db(rows, str(path), compress=compress, dict_kib=16)
+        paths[compress] = path
+    return paths
+
+
+def descriptions(db_path):
+    conn = app.get_db_connection(db_path)
+    codec = app.get_description_codec(conn, db_path)
+    rows = conn.execute("SELECT id, description FROM wine_descriptions ORDER BY id").fetchall()
+    conn.close()
+    return codec, {row["id"]: app.decode_wine(dict(row), codec)["description"] for row in rows}
+
+
+def test_compressed_descriptions_decode_to_the_originals(databases):
+    plain_codec, plain = descriptions(databases[False])
+    codec, decoded = descriptions(databases[True])
+    assert plain_codec is None
+    assert codec is not None
+    assert decoded == plain
+    assert databases[True].stat().st_size < databases[False].stat().st_size
+
+
+def test_missing_zstandard_is_reported(databases, monkeypatch):
+    monkeypatch.setattr(app, "zstandard", None)
+    monkeypatch.setattr(app, "DESCRIPTION_CODECS", {})
+    conn = app.get_db_connection(databases[True])
+    with pytest.raises(RuntimeError, match="zstandard"):
+        app.get_description_codec(conn, databases[True])
+    conn.close()
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+import app
+
+LABEL = f"{app.IMAGE_DIR}cat_3_bottle 1.png"
+
+
+def test_label_links_preconnect_and_preload():
+    assert app.label_preload_links(LABEL) == [
+        f"<{app.IMAGE_ORIGIN}>; rel=preconnect".encode(),
+        f"<{app.IMAGE_DIR}cat_3_bottle%201.png>; rel=preload; as=image".encode(),
+    ]
+
+
+def test_derivative_links_preload_srcset(monkeypatch):
+    monkeypatch.setattr(app, "LABEL_DERIVATIVES", True)
+    src, srcset = app.label_image(LABEL)
+    assert app.label_preload_links(LABEL) == [f'<{src}>; rel=preload; as=image; imagesrcset="{srcset}"'.encode()]
+
+
+def test_fallback_image_links():
+    assert app.label_preload_links(app.FALLBACK_IMAGE) == [f"<{app.FALLBACK_IMAGE}>; rel=preload; as=image".encode()]
+
+
+@pytest.fixture
+def started(monkeypatch):
+    event = threading.Event()
+    event.set()
+    monkeypatch.setattr(app, "STARTUP_COMPLETE", event)
+
+
+def test_pooled_page_sends_its_label_hints(client, started, monkeypatch):
+    pool = app.WinePagePool(depth=1, refill_per_second=1, render=lambda: (LABEL, "<html>pooled</html>"))
+    pool._pages.append((LABEL, b"<html>pooled</html>"))
+    monkeypatch.setattr(app, "WINE_PAGE_POOL", pool)
+    response = client.get("/")
+    assert response.text == "<html>pooled</html>"
+    assert response.headers["link"] == b", ".join(app.label_preload_links(LABEL)).decode()
+
+
+def test_startup_fallback_page_sends_hints(client):
+    assert not app.STARTUP_COMPLETE.is_set()
+    response = client.get("/wine/7")
+    assert response.headers["cache-control"] == "no-store"
+    assert response.headers["link"] == f"<{app.FALLBACK_IMAGE}>; rel=preload; as=image"
+
+
+def test_other_pages_have_no_hints(client):
+    assert "link" not in client.get("/about").headers
+
+
+def run_asgi(path: str) -> list[dict]:
+    """Drive the app as a server offering the early hint extension; returns the sent messages."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 80),
+        "extensions": {"http.response.early_hint": {}},
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app.app(scope, receive, send))
+    return messages
+
+
+def test_103_sent_before_the_response():
+    messages = run_asgi("/")
+    assert [message["type"] for message in messages[:2]] == ["http.response.early_hint", "http.response.start"]
+    assert messages[0]["links"] == app.label_preload_links(app.FALLBACK_IMAGE)
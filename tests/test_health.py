@@ -0,0 +1,20 @@
+import logging
+
+import app
+
+
+def test_database_probe_while_loading_is_not_an_error(caplog, monkeypatch):
+    monkeypatch.setattr(app, "STARTUP_COMPLETE", app.threading.Event())
+    with caplog.at_level(logging.INFO, logger="app"):
+        result = app.HEALTH_PROBER.probe("database")
+    assert not result.healthy
+    assert result.error == "database still loading"
+    assert [record.levelno for record in caplog.records] == [logging.INFO]
+
+
+def test_failed_probe_is_an_error(caplog):
+    prober = app.HealthProber({"broken": lambda: 1 / 0}, interval=15)
+    with caplog.at_level(logging.INFO, logger="app"):
+        assert not prober.probe("broken").healthy
+    assert [record.levelno for record in caplog.records] == [logging.ERROR]
+    assert not prober.is_healthy("broken")
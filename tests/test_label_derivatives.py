@@ -0,0 +1,109 @@
+import io
+
+import pytest
+
+import app
+
+Image = pytest.importorskip("PIL.Image")
+
+WIDTH = app.LABEL_DERIVATIVE_WIDTHS[0]
+
+
+def png(size: tuple[int, int], mode: str = "RGB") -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, size, (120, 20, 40, 128) if mode == "RGBA" else (120, 20, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+LABELS = {
+    "cat_3_large.png": png((1000, 1500)),
+    "cat_3_small.png": png((100, 150)),
+    "cat_7_clear.png": png((1000, 1000), "RGBA"),
+}
+
+
+class FakeResponse:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def read(self) -> bytes:
+        return self.data
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def __init__(self):
+        self.gets: list[str] = []
+
+    def get_object(self, bucket: str, object_name: str) -> FakeResponse:
+        self.gets.append(object_name)
+        return FakeResponse(LABELS[object_name])
+
+
+@pytest.fixture
+def minio(tmp_path, monkeypatch):
+    client = FakeMinio()
+    monkeypatch.setattr(app, "LABEL_DERIVATIVES", True)
+    monkeypatch.setattr(app, "LABEL_CACHE_DIR", tmp_path / "labels")
+    monkeypatch.setattr(app, "BOTTLE_LIST", sorted((int(name.split("_")[1]), name) for name in LABELS))
+    monkeypatch.setattr(app, "get_minio_client", lambda: client)
+    return client
+
+
+def get_image(client, path: str):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["cache-control"] == app.LABEL_DERIVATIVE_CACHE_CONTROL
+    return response, Image.open(io.BytesIO(response.content))
+
+
+@pytest.mark.parametrize("width", app.LABEL_DERIVATIVE_WIDTHS)
+def test_label_is_scaled_to_webp(client, minio, width):
+    _, image = get_image(client, app.label_derivative_url(width, "cat_3_large.png"))
+    assert image.format == "WEBP"
+    assert image.size == (width, round(1500 * width / 1000))
+
+
+def test_derivative_is_built_once_then_served_from_the_cache(client, minio):
+    url = app.label_derivative_url(WIDTH, "cat_3_large.png")
+    first, _ = get_image(client, url)
+    second, _ = get_image(client, url)
+    assert second.content == first.content
+    assert minio.gets == ["cat_3_large.png"]
+    assert app.label_derivative_path(WIDTH, "cat_3_large.png").exists()
+
+
+def test_small_labels_are_not_scaled_up(client, minio):
+    _, image = get_image(client, app.label_derivative_url(WIDTH, "cat_3_small.png"))
+    assert image.size == (100, 150)
+
+
+def test_transparency_is_kept(client, minio):
+    _, image = get_image(client, app.label_derivative_url(WIDTH, "cat_7_clear.png"))
+    assert image.mode == "RGBA"
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        f"/label/{WIDTH + 1}/cat_3_large.png",
+        f"/label/{WIDTH}/cat_3_missing.png",
+        f"/label/{WIDTH}/..%2Fcat_3_large.png",
+        f"/label/{WIDTH}/other.png",
+    ],
+    ids=["unknown width", "unknown label", "traversal", "not a label name"],
+)
+def test_unknown_derivatives_are_404(client, minio, path):
+    assert client.get(path).status_code == 404
+    assert minio.gets == []
+
+
+def test_404_when_derivatives_are_off(client, minio, monkeypatch):
+    monkeypatch.setattr(app, "LABEL_DERIVATIVES", False)
+    assert client.get(app.label_derivative_url(WIDTH, "cat_3_large.png")).status_code == 404
@@ -0,0 +1,83 @@
+import pytest
+
+import app
+from app import LabelIndex
+
+BOTTLES = sorted(
+    [
+        (3, "cat_3_b.png"),
+        (1, "cat_1_a.png"),
+        (3, "cat_3_a.png"),
+        (7, "cat_7_rosé.png"),
+        (1, "cat_1_b.png"),
+        (3, "cat_3_c.png"),
+    ]
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "labels.idx"
+    LabelIndex.write(path, BOTTLES)
+    return LabelIndex.open(path)
+
+
+def test_reads_back_every_label(index):
+    assert len(index) == len(BOTTLES)
+    assert list(index) == BOTTLES
+    assert index[-1] == BOTTLES[-1]
+    assert index.digest == LabelIndex.digest_of(BOTTLES)
+
+
+def test_out_of_range(index):
+    with pytest.raises(IndexError):
+        index[len(BOTTLES)]
+    with pytest.raises(IndexError):
+        index[-len(BOTTLES) - 1]
+
+
+def test_slices_are_views(index):
+    view = index[2:5]
+    assert isinstance(view, LabelIndex)
+    assert list(view) == BOTTLES[2:5]
+    assert list(view[1:]) == BOTTLES[3:5]
+    assert view[-1] == BOTTLES[4]
+    assert list(index[4:2]) == []
+    assert index[::2] == BOTTLES[::2]
+
+
+def test_by_category(index):
+    groups = index.by_category()
+    assert sorted(groups) == [1, 3, 7]
+    for category, view in groups.items():
+        assert list(view) == [bottle for bottle in BOTTLES if bottle[0] == category]
+    assert {category: list(view) for category, view in index[1:4].by_category().items()} == {
+        1: [BOTTLES[1]],
+        3: BOTTLES[2:4],
+    }
+
+
+def test_empty_index(tmp_path):
+    path = tmp_path / "labels.idx"
+    LabelIndex.write(path, [])
+    index = LabelIndex.open(path)
+    assert len(index) == 0
+    assert index.by_category() == {}
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "labels.idx"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        LabelIndex.open(path)
+
+
+def test_open_label_index_rewrites_stale_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "LABEL_INDEX_PATH", tmp_path / "bottle_labels.idx")
+    assert list(app.open_label_index(list(reversed(BOTTLES)))) == BOTTLES
+    mtime = app.LABEL_INDEX_PATH.stat().st_mtime_ns
+
+    assert list(app.open_label_index(BOTTLES)) == BOTTLES
+    assert app.LABEL_INDEX_PATH.stat().st_mtime_ns == mtime  # same labels: the file is reused
+
+    assert list(app.open_label_index(BOTTLES[:2])) == BOTTLES[:2]
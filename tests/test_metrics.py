@@ -0,0 +1,108 @@
+import collections
+import re
+
+import pytest
+
+import app
+
+SAMPLE = re.compile(
+    r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>(?:[^"}]|"(?:[^"\\]|\\.)*")*)\})? (?P<value>\S+)$'
+)
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+HISTOGRAM_SUFFIXES = ("_bucket", "_sum", "_count")
+
+Samples = dict[tuple[str, tuple[tuple[str, str], ...]], float]
+
+
+def scrape(client) -> tuple[dict[str, str], Samples]:
+    """Parse /metrics, checking the text format; returns the declared types and the samples."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert response.text.endswith("\n")
+
+    helps: set[str] = set()
+    types: dict[str, str] = {}
+    samples: Samples = {}
+    for line in response.text.splitlines():
+        if line.startswith("# HELP "):
+            name = line.split()[2]
+            assert name not in helps, f"duplicate HELP for {name}"
+            helps.add(name)
+        elif line.startswith("# TYPE "):
+            _, _, name, kind = line.split()
+            assert name in helps, f"TYPE before HELP for {name}"
+            assert name not in types, f"duplicate TYPE for {name}"
+            assert kind in ("counter", "gauge", "histogram")
+            types[name] = kind
+        else:
+            match = SAMPLE.match(line)
+            assert match, f"malformed sample: {line!r}"
+            name = match["name"]
+            family = name
+            if family not in types:
+                family = next((name.removesuffix(s) for s in HISTOGRAM_SUFFIXES if name.endswith(s)), name)
+                assert types.get(family) == "histogram", f"{name} has no TYPE line"
+            labels = tuple(LABEL.findall(match["labels"] or ""))
+            assert (name, labels) not in samples, f"duplicate sample: {line!r}"
+            samples[name, labels] = float(match["value"])
+    return types, samples
+
+
+def test_counters_are_named_total_and_gauges_are_not(client):
+    types, _ = scrape(client)
+    for name, kind in types.items():
+        assert name.endswith("_total") == (kind == "counter"), f"{name} is a {kind}"
+    assert types["wine_db_pool"] == "gauge"
+    assert types["wine_db_pool_checkouts_total"] == "counter"
+    assert types["wine_page_pool"] == "gauge"
+    assert types["wine_page_pool_hits_total"] == "counter"
+
+
+def test_request_histogram_buckets_are_cumulative(client):
+    client.get("/about")
+    _, samples = scrape(client)
+    route = (("route", "/about"), ("method", "GET"), ("status", "200"))
+    buckets = [
+        value
+        for (name, labels), value in samples.items()
+        if name == "wine_http_request_duration_seconds_bucket" and labels[:3] == route
+    ]
+    assert len(buckets) == len(app.LATENCY_BUCKETS) + 1
+    assert buckets == sorted(buckets)
+    assert buckets[-1] == samples["wine_http_request_duration_seconds_count", route] >= 1
+    assert samples["wine_http_request_duration_seconds_sum", route] > 0
+
+
+def test_labelled_counter_increments(client):
+    key = ("wine_minio_errors_total", (("operation", "metrics_test"),))
+    before = scrape(client)[1].get(key, 0)
+    app.MINIO_ERRORS.inc("metrics_test")
+    assert scrape(client)[1][key] == before + 1
+
+
+def test_pool_counters_include_retired_pools(client, monkeypatch):
+    monkeypatch.setattr(app, "DB_POOL", None)
+    monkeypatch.setattr(app, "RETIRED_DB_POOL_STATS", collections.Counter(checkouts=7, timeouts=2))
+    _, samples = scrape(client)
+    assert samples["wine_db_pool_checkouts_total", ()] == 7
+    assert samples["wine_db_pool_timeouts_total", ()] == 2
+    assert not any(name == "wine_db_pool" for name, _ in samples)
+
+
+@pytest.fixture
+def page_pool(monkeypatch):
+    pool = app.WinePagePool(depth=3, refill_per_second=1, render=lambda: ("", ""))
+    pool._pages.append(("label.png", b"<html></html>"))
+    pool.pop()
+    pool.pop()
+    monkeypatch.setattr(app, "WINE_PAGE_POOL", pool)
+    return pool
+
+
+def test_page_pool_gauges_and_counters(client, page_pool):
+    _, samples = scrape(client)
+    assert samples["wine_page_pool", (("stat", "depth"),)] == 3
+    assert samples["wine_page_pool", (("stat", "available"),)] == 0
+    assert samples["wine_page_pool_hits_total", ()] == 1
+    assert samples["wine_page_pool_misses_total", ()] == 1
@@ -0,0 +1,21 @@
+import pydantic
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_refill_rate_must_be_positive(rate):
+    with pytest.raises(ValueError, match="greater than 0"):
+        app.WinePagePool(depth=1, refill_per_second=rate, render=lambda: ("", ""))
+    with pytest.raises(pydantic.ValidationError, match="page_pool_refill_per_second"):
+        app.Settings(**{**app.settings.model_dump(), "page_pool_refill_per_second": rate})
+
+
+def test_pop_returns_pages_then_counts_misses():
+    pool = app.WinePagePool(depth=2, refill_per_second=1, render=lambda: ("", ""))
+    pool._pages.append(("label.png", b"<html></html>"))
+    assert pool.pop() == ("label.png", b"<html></html>")
+    assert pool.pop() is None
+    assert pool.stats()["hits"] == 1
+    assert pool.stats()["misses"] == 1
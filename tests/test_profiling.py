@@ -0,0 +1,41 @@
+import pytest
+
+import app
+
+ENDPOINT = "/debug/memory/stop"
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setattr(app.settings, "profiling_token", "s3cret")
+    return "s3cret"
+
+
+def test_debug_endpoints_are_hidden_without_a_token(client):
+    assert not app.settings.profiling_token
+    assert client.post(ENDPOINT, headers={"Authorization": "Bearer anything"}).status_code == 404
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {},
+        {"Authorization": "Bearer wrong"},
+        {"Authorization": "s3cret"},
+        {"Authorization": "Basic s3cret"},
+        {"Authorization": "Bearer"},
+        {"Authorization": "Bearer s3cret2"},
+    ],
+    ids=["missing", "wrong token", "raw token", "other scheme", "no token", "longer token"],
+)
+def test_rejected_without_a_bearer_token(client, token, headers):
+    response = client.post(ENDPOINT, headers=headers)
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+@pytest.mark.parametrize("value", ["Bearer s3cret", "bearer s3cret", "BEARER  s3cret "])
+def test_valid_bearer_token(client, token, value):
+    response = client.post(ENDPOINT, headers={"Authorization": value})
+    assert response.status_code == 200
+    assert response.json() == {"tracing": False}
@@ -0,0 +1,201 @@
+import sqlite3
+
+import pytest
+from csv_to_sqlite import create_fts_index
+from csv_to_sqlite import write_sqlite_db
+
+import app
+from app import MAX_SEARCH_TERMS
+from app import fts_query
+
+
+@pytest.mark.parametrize(
+    "q, expected",
+    [
+        ("cherry", '"cherry"*'),
+        ("Cherry  OAK", '"cherry" "oak"*'),
+        ("cherry o", '"cherry" "o"'),
+        ("", ""),
+        ("  ?!* ", ""),
+        # FTS5 syntax in user input is matched as plain words
+        ("cherry OR oak", '"cherry" "or" "oak"*'),
+        ("NOT cherry", '"not" "cherry"*'),
+        ("name:cherry", '"name" "cherry"*'),
+        ('"cherry oak"', '"cherry" "oak"*'),
+        ("cher*", '"cher"*'),
+        ("(cherry) AND ^oak", '"cherry" "and" "oak"*'),
+        ("NEAR(cherry oak, 2)", '"near" "cherry" "oak" "2"'),
+        ("rosé côte", '"rosé" "côte"*'),
+    ],
+)
+def test_fts_query(q, expected):
+    assert fts_query(q) == expected
+
+
+def test_fts_query_caps_terms():
+    assert fts_query(" ".join(f"w{i}" for i in range(20))).count('"') == 2 * MAX_SEARCH_TERMS
+
+
+@pytest.fixture(scope="module")
+def fts_db():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE wine_descriptions (id TEXT, name TEXT, category_2 TEXT, origin TEXT, description TEXT)")
+    conn.executemany(
+        "INSERT INTO wine_descriptions VALUES (?, ?, ?, ?, ?)",
+        [
+            ("1", "Cherry Hill", "Merlot", "Napa", "Ripe cherry and oak."),
+            ("2", "Oak Ridge", "Chardonnay", "Sonoma", "Buttery oak, name:cherry."),
+            ("3", "NOT OR AND", "Riesling", "Mosel", "Peach and slate."),
+        ],
+    )
+    create_fts_index(conn.cursor())
+    return conn
+
+
+@pytest.mark.parametrize(
+    "q", ['"', "'", "(", "AND", "OR oak", "NOT", "name:", "*", "-", "^", "NEAR(", "cherry:oak", "\x00", "a" * 500]
+)
+def test_fts_query_is_valid_fts5(fts_db, q):
+    match = fts_query(q)
+    if match:
+        fts_db.execute("SELECT rowid FROM wine_fts WHERE wine_fts MATCH ?", (match,)).fetchall()
+
+
+def test_fts_query_matches_operator_words_as_text(fts_db):
+    rows = fts_db.execute("SELECT rowid FROM wine_fts WHERE wine_fts MATCH ?", (fts_query("not or and"),)).fetchall()
+    assert [row[0] for row in rows] == [3]
+
+
+def ranking_rows():
+    """Weak matches first in rowid order (rows are clustered by category), the strongest ones last."""
+    filler = "plum oak vanilla tannin finish palate nose aromas black currant earthy mineral " * 3
+    for i in range(300):
+        yield (f"weak-{i}", f"Bordeaux {i}", "Wine", "Bordeaux Red Blends", "Bordeaux, France", f"{filler} cherry")
+    for i in range(app.SEARCH_PAGE_SIZE):
+        category = ["Merlot", "Riesling", "Syrah/Shiraz", "Zinfandel"][i % 4]
+        yield (f"strong-{i}", f"Cherry Cherry {i}", "Wine", category, "Napa Valley, California", "Cherry cherry.")
+
+
+@pytest.fixture
+def search_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "wine_data.db"
+    write_sqlite_db(ranking_rows(), str(db_path), fts=True)
+    monkeypatch.setattr(app, "DB_PATH", db_path)
+    monkeypatch.setattr(app, "DB_POOL", None)
+    monkeypatch.setattr(app, "SEARCH_POOL", None)
+    app.search_wines_cached.cache_clear()
+    yield db_path
+    app.get_search_pool().close()
+    app.get_db_pool().close()
+    app.search_wines_cached.cache_clear()
+
+
+def test_search_ranks_every_match(search_db):
+    assert 300 + app.SEARCH_PAGE_SIZE <= app.settings.search_max_candidates
+    results, has_more = app.search_wines("cherry")
+    assert has_more
+    assert {wine["id"] for wine in results} == {f"strong-{i}" for i in range(app.SEARCH_PAGE_SIZE)}
+    assert {wine["category_2"] for wine in results} == {"Merlot", "Riesling", "Syrah/Shiraz", "Zinfandel"}
+
+
+def test_search_pages_follow_bm25_order(search_db):
+    with sqlite3.connect(search_db) as conn:
+        expected = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT d.id FROM wine_fts JOIN wine_descriptions AS d ON d.rowid = wine_fts.rowid
+                WHERE wine_fts MATCH ? ORDER BY bm25(wine_fts, 10.0, 1.0), d.rowid
+                """,
+                (fts_query("cherry"),),
+            )
+        ]
+    pages = []
+    page = 1
+    while True:
+        results, has_more = app.search_wines("cherry", page)
+        pages.extend(wine["id"] for wine in results)
+        if not has_more:
+            break
+        page += 1
+    assert len(pages) == len(expected) == 300 + app.SEARCH_PAGE_SIZE
+    assert set(pages) == set(expected)
+    assert pages[: app.SEARCH_PAGE_SIZE] == expected[: app.SEARCH_PAGE_SIZE]
+
+
+def all_pages(q: str) -> list[str]:
+    ids = []
+    for page in range(1, app.MAX_SEARCH_PAGE + 1):
+        results, has_more = app.search_wines(q, page)
+        ids.extend(wine["id"] for wine in results)
+        if not has_more:
+            break
+    return ids
+
+
+def test_common_word_is_ranked_over_an_even_sample(search_db, monkeypatch):
+    monkeypatch.setattr(app.settings, "search_max_candidates", 40)
+    step = 8  # ceil(320 rows / 40)
+    with sqlite3.connect(search_db) as conn:
+        expected = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT d.id FROM wine_fts JOIN wine_descriptions AS d ON d.rowid = wine_fts.rowid
+                WHERE wine_fts MATCH ? AND d.rowid % ? = 0 ORDER BY bm25(wine_fts, 10.0, 1.0), d.rowid
+                """,
+                (fts_query("cherry"), step),
+            )
+        ]
+    # The strong matches sorted last by rowid are sampled too, and ranked first
+    assert expected[0].startswith("strong-")
+    assert all_pages("cherry") == expected
+    assert len(expected) == (300 + app.SEARCH_PAGE_SIZE) // step
+
+
+def test_search_uses_its_own_connections(search_db):
+    app.search_wines("cherry")
+    assert app.get_search_pool() is not app.get_db_pool()
+    assert app.get_search_pool().max_size == app.settings.search_workers
+    assert app.get_search_pool().stats()["checkouts"] == 1
+    assert app.get_db_pool().stats()["checkouts"] == 0
+
+
+def test_search_over_its_time_budget_is_a_503(search_db, monkeypatch):
+    monkeypatch.setattr(app.settings, "search_timeout", 0.0)
+    monkeypatch.setattr(app, "SEARCH_PROGRESS_INSTRUCTIONS", 1)
+    with pytest.raises(app.HTTPException) as excinfo:
+        app.search_wines("cherry")
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers == {"Retry-After": "1"}
+    assert app.search_wines_cached.cache_info().currsize == 0
+    monkeypatch.setattr(app.settings, "search_timeout", 10.0)
+    assert app.search_wines("cherry")[0]
+
+
+@pytest.fixture
+def started(monkeypatch):
+    event = app.threading.Event()
+    event.set()
+    monkeypatch.setattr(app, "STARTUP_COMPLETE", event)
+
+
+def test_api_search(client, search_db, started):
+    response = client.get("/api/search", params={"q": "cherry", "page": 2})
+    assert response.status_code == 200
+    assert response.json()["page"] == 2
+    assert len(response.json()["results"]) == app.SEARCH_PAGE_SIZE
+
+
+def test_search_page_depth_is_capped(client, search_db, started):
+    assert client.get("/api/search", params={"q": "cherry", "page": app.MAX_SEARCH_PAGE + 1}).status_code == 422
+
+
+def test_search_is_refused_when_the_queue_is_full(client, search_db, started, monkeypatch):
+    monkeypatch.setattr(app, "SEARCH_SLOTS", app.threading.BoundedSemaphore(1))
+    app.SEARCH_SLOTS.acquire()
+    response = client.get("/api/search", params={"q": "cherry"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    app.SEARCH_SLOTS.release()
+    assert client.get("/api/search", params={"q": "cherry"}).status_code == 200
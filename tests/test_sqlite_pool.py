@@ -0,0 +1,101 @@
+import queue
+import sqlite3
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app import SQLitePool
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "pool.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+    return path
+
+
+def is_closed(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def test_reuses_connections(db_path):
+    pool = SQLitePool(db_path, max_size=4, timeout=1)
+    with pool.connection() as first:
+        assert first.execute("SELECT x FROM t").fetchone()[0] == 1
+    with pool.connection() as second:
+        assert second is first
+    stats = pool.stats()
+    assert stats["size"] == 1
+    assert stats["idle"] == 1
+    assert stats["checkouts"] == 2
+
+
+def test_connections_are_read_only(db_path):
+    pool = SQLitePool(db_path, max_size=1, timeout=1)
+    with pool.connection() as conn, pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO t VALUES (2)")
+
+
+def test_times_out_when_exhausted(db_path):
+    pool = SQLitePool(db_path, max_size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(HTTPException) as excinfo, pool.connection():
+            pass
+    assert excinfo.value.status_code == 503
+    assert pool.stats()["timeouts"] == 1
+    assert pool.stats()["size"] == 1
+
+
+def test_close_closes_idle_and_returned_connections(db_path):
+    pool = SQLitePool(db_path, max_size=2, timeout=1)
+    with pool.connection() as busy:
+        with pool.connection() as idle:
+            pass
+        pool.close()
+        assert is_closed(idle)
+        assert not is_closed(busy)
+    assert is_closed(busy)
+    assert pool.stats()["size"] == 0
+    assert pool.stats()["idle"] == 0
+
+
+class SlowPutQueue(queue.LifoQueue):
+    """Idle queue that signals and pauses before returning a connection, to widen the release/close race."""
+
+    def __init__(self):
+        super().__init__()
+        self.putting = threading.Event()
+
+    def put(self, item, block=True, timeout=None):
+        self.putting.set()
+        time.sleep(0.1)
+        super().put(item, block, timeout)
+
+
+def test_connection_released_during_close_is_closed(db_path):
+    pool = SQLitePool(db_path, max_size=1, timeout=1)
+    pool._idle = SlowPutQueue()
+    checked_out: list[sqlite3.Connection] = []
+
+    def use_connection():
+        with pool.connection() as conn:
+            checked_out.append(conn)
+
+    thread = threading.Thread(target=use_connection)
+    thread.start()
+    assert pool._idle.putting.wait(timeout=5)
+    pool.close()
+    thread.join()
+
+    assert is_closed(checked_out[0])
+    assert pool.stats()["size"] == 0
+    assert pool.stats()["idle"] == 0
@@ -0,0 +1,71 @@
+import pytest
+
+import app
+from app import negotiate_content_coding
+
+BODIES = {"identity": b"x", "gzip": b"x", "br": b"x"}
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", "identity"),
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("GZIP", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("br; q=0, gzip;q=0.5", "gzip"),
+        ("gzip;q=0", "identity"),
+        ("gzip;q=oops", "identity"),
+        ("deflate", "identity"),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("identity", "identity"),
+    ],
+)
+def test_negotiate_content_coding(accept_encoding, expected):
+    assert negotiate_content_coding(accept_encoding, BODIES) == expected
+
+
+def test_negotiate_content_coding_only_offers_available_codings():
+    assert negotiate_content_coding("br, gzip", {"identity": b"x", "gzip": b"x"}) == "gzip"
+
+
+def get(client, path, **headers):
+    return client.get(path, headers={"accept-encoding": "identity", **headers})
+
+
+@pytest.mark.parametrize("path", ["/robots.txt", "/sitemap.xml", "/about"])
+def test_static_response_etag_and_304(client, path):
+    response = get(client, path)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    not_modified = get(client, path, **{"if-none-match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    assert get(client, path, **{"if-none-match": f'"other", W/{etag}'}).status_code == 304
+    assert get(client, path, **{"if-none-match": "*"}).status_code == 304
+    assert get(client, path, **{"if-none-match": '"other"'}).status_code == 200
+
+
+def test_static_response_serves_negotiated_variant(client):
+    gzip_response = client.get("/robots.txt", headers={"accept-encoding": "gzip"})
+    assert gzip_response.headers["content-encoding"] == "gzip"
+    assert gzip_response.text == app.render_robots_txt()
+
+    identity_etag = get(client, "/robots.txt").headers["etag"]
+    assert gzip_response.headers["etag"] != identity_etag
+    # A cached identity copy revalidates even when the client now accepts gzip
+    revalidated = client.get("/robots.txt", headers={"accept-encoding": "gzip", "if-none-match": identity_etag})
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.skipif(app.brotli is None, reason="brotli is not installed")
+def test_static_response_brotli_variant(client):
+    response = client.get("/robots.txt", headers={"accept-encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.text == app.render_robots_txt()  # decoded by httpx
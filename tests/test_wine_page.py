@@ -0,0 +1,53 @@
+import pytest
+
+import app
+
+WINES = [
+    {
+        "name": "Château Margaux 2015",
+        "category_2": "Bordeaux Red Blends",
+        "origin": "Bordeaux, France",
+        "description": "Black currant, cedar and violets.",
+    },
+    {
+        "name": "<script>alert('x')</script> & \"Sons\"",
+        "category_2": "Rosé",
+        "origin": "{{ w_origin }} {% raw %}",
+        "description": "Line one\nline two — 100% \\ 'quoted' </div>",
+    },
+    {"name": "", "category_2": "", "origin": "", "description": ""},
+]
+
+
+def full_render(request, image_path, wine):
+    """What the skeleton replaces: index.html rendered by Jinja for every page."""
+    fields = app.wine_page_fields(image_path, wine)
+    return app.templates.get_template("index.html").render(app.wine_page_context(request, fields))
+
+
+@pytest.fixture(params=[False, True], ids=["originals", "derivatives"])
+def label_derivatives(request, monkeypatch):
+    monkeypatch.setattr(app, "LABEL_DERIVATIVES", request.param)
+    monkeypatch.setattr(app, "WINE_PAGE_SKELETONS", {})
+    return request.param
+
+
+@pytest.mark.parametrize("wine", WINES)
+@pytest.mark.parametrize("image_path", ["cat_3_bottle 1.png", app.FALLBACK_IMAGE])
+@pytest.mark.parametrize("path", ["/", "/wine/42"])
+def test_skeleton_matches_full_render(label_derivatives, wine, image_path, path):
+    request = app.site_request(path)
+    page = app.render_wine_page(request, image_path, wine)
+    assert page == full_render(request, image_path, wine)
+    if label_derivatives and image_path != app.FALLBACK_IMAGE:
+        assert "srcset=" in page
+
+
+def test_skeleton_per_base_url(monkeypatch):
+    monkeypatch.setattr(app, "WINE_PAGE_SKELETONS", {})
+    request = app.site_request("/")
+    other = app.Request({**request.scope, "headers": [(b"host", b"other.example")]})
+    assert app.render_wine_page(other, "cat_1_a.png", WINES[0]) == full_render(other, "cat_1_a.png", WINES[0])
+    assert len(app.WINE_PAGE_SKELETONS) == 1
+    app.render_wine_page(request, "cat_1_a.png", WINES[0])
+    assert len(app.WINE_PAGE_SKELETONS) == 2